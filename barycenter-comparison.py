@@ -4,6 +4,7 @@ import numpy as np
 import simulation as sm
 import spice as sp
 import plot as pl
+import catalogue as ct
 
 start = datetime.datetime(2000, 1, 1, 0, 0, 0)
 dt = 1e3
@@ -12,52 +13,56 @@ path_length = 1000
 limit_scale = 1.5
 video_path = "trajectories.avi"
 
-targets = [
+targets = ct.Catalogue([
     {
         "id": 10,
         "name": "Sun",
-        "spice color": "orange",
-        "sim color": "red",
-        "marker scale": 300,
-        "path scale": 300,
+        "color": "orange",
+        "marker_scale": 300,
+        "path_scale": 300,
         "display": True
     },
     {
         "id": 5,
         "name": "Jupiter",
-        "spice color": "blue",
-        "sim color": "purple",
-        "marker scale": 500,
-        "path scale": 1,
+        "color": "blue",
+        "marker_scale": 500,
+        "path_scale": 1,
         "display": True
     },
     {
         "id": 6,
         "name": "Saturn",
-        "spice color": "green",
-        "sim color": "teal",
-        "marker scale": 500,
-        "path scale": 1,
+        "color": "green",
+        "marker_scale": 500,
+        "path_scale": 1,
         "display": True
     },
     # {
     #     "id": 7,
     #     "name": "Uranus",
-    #     "spice color": "brown",
-    #     "sim color": "black",
-    #     "marker scale": 2000,
-    #     "path scale": 1,
+    #     "color": "brown",
+    #     "marker_scale": 2000,
+    #     "path_scale": 1,
     #     "display": True
     # },
     # {
     #     "id": 8,
     #     "name": "Neptune",
-    #     "spice color": "red",
-    #     "sim color": "pink",
-    #     "marker scale": 2000,
-    #     "path scale": 1,
+    #     "color": "red",
+    #     "marker_scale": 2000,
+    #     "path_scale": 1,
     #     "display": True
     # }
+])
+
+# Simulated bodies are drawn in these colors, in catalogue order
+sim_colors = [
+    "red",
+    "purple",
+    "teal",
+    # "black",
+    # "pink"
 ]
 
 # Load kernels
@@ -96,34 +101,14 @@ plot = pl.NBodyPlot(
 )
 
 # Set up SPICE targets
-for target in targets:
-    if target["display"]:
-        spice.add(
-            id=target["id"]
-        )
-
-        plot.add(
-            label=target["name"]+" (SPICE)",
-            color=target["spice color"],
-            path_scale=target["path scale"],
-            radius=sp.radius(target["id"]) * target["marker scale"]
-        )
+spice.add_catalogue(targets)
+plot.add_catalogue(targets, label="{} (SPICE)")
 
 # Set up simulation targets
-for target in targets:
-    sim.add_naif(
-        id=target["id"],
-        display=target["display"]
-    )
-
-    if target["display"]:
-        plot.add(
-            label=target["name"]+" (SIM)",
-            color=target["sim color"],
-            path_scale=target["path scale"],
-            radius=sp.radius(target["id"]) * target["marker scale"]
-        )
+sim.add_catalogue(targets)
+plot.add_catalogue(targets, label="{} (SIM)", colors=sim_colors)
 
 # Run or save animation
 #plot.run()
-plot.save(video_path)
+rate = plot.export(video_path)
+print(f"Exported at {rate:.1f} frames/s")
@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
 import spice as sp
+import plot as pl
+import catalogue as ct
 
 # Simulation settings
 #  Simulation starts at start_time [year, month, day, hour, minute, second]
@@ -14,43 +16,43 @@ start_time = datetime.datetime(2000, 1, 1, 0, 0, 0)
 dt = 1e3
 n = 5000
 path_length = 500
-targets = [
+targets = ct.Catalogue([
     {
         "id": 10,
         "name": "Sun",
         "color": "orange",
-        "marker scale": 300,
-        "path scale": 300
+        "marker_scale": 300,
+        "path_scale": 300
     },
     {
         "id": 5,
         "name": "Jupiter",
         "color": "blue",
-        "marker scale": 1000,
-        "path scale": 1
+        "marker_scale": 1000,
+        "path_scale": 1
     },
     {
         "id": 6,
         "name": "Saturn",
         "color": "green",
-        "marker scale": 1000,
-        "path scale": 1
+        "marker_scale": 1000,
+        "path_scale": 1
     },
     # {
     #     "id": 7,
     #     "name": "Uranus",
     #     "color": "brown",
-    #     "marker scale": 1500,
-    #     "path scale": 1
+    #     "marker_scale": 1500,
+    #     "path_scale": 1
     # },
     # {
     #     "id": 8,
     #     "name": "Neptune",
     #     "color": "brown",
-    #     "marker scale": 1500,
-    #     "path scale": 1
+    #     "marker_scale": 1500,
+    #     "path_scale": 1
     # }
-]
+])
 
 # Load kernels
 sp.furnsh((
@@ -71,32 +73,18 @@ time = start_time
 
 
 # Obtain starting positions, velocities and parameters
-r = np.empty((0, path_length, 3))
-v = np.empty((0, 3))
-masses = np.empty(0)
-radii = []
-for target in targets:
-    position = sp.position(target["id"], time)
-    velocity = sp.velocity(target["id"], time)
-
-    r = np.append(
-        r,
-        np.repeat(
-            position[None, None, :],
-            path_length,
-            axis=1
-        ),
-        axis=0
-    )
-    v = np.append(
-        v, velocity[None, :], 0
-    )
-
-    mass = sp.mass(target["id"])
-    radius = sp.radius(target["id"])
-    masses = np.append(masses, mass)
-    radii.append(radius)
-
+masses, state, missing = sp.bodies(targets.ids, time)
+if missing:
+    raise ValueError(f"Missing from the loaded kernels: {missing}")
+r = state[:, :3]
+v = state[:, 3:6]
+radii = targets.radii
+
+#   Path history of every target, scaled for display
+trails = [
+    pl.Trail(path_length, r[i], targets.path_scales[i])
+    for i in range(len(targets))
+]
 
 # Prepare display
 figure = plt.figure("Sun movement")
@@ -104,7 +92,7 @@ axis = figure.add_subplot(1, 1, 1, aspect="equal")
 
 #   Set axis limits
 distance = max(
-    np.linalg.norm(r[i, 0, :]) * targets[i]["path scale"]
+    np.linalg.norm(r[i, :]) * targets.path_scales[i]
     for i in range(len(targets))
 )
 axis.set_xlim(-distance * 1.5, distance * 1.5)
@@ -115,18 +103,18 @@ paths = []
 objects = []
 for i in range(len(targets)):
     paths.append(axis.plot(
-        r[i, :, 0] * targets[i]["path scale"],
-        r[i, :, 1] * targets[i]["path scale"],
-        color=targets[i]["color"],
-        label=targets[i]["name"]
+        trails[i].view[:, 0],
+        trails[i].view[:, 1],
+        color=targets.colors[i],
+        label=targets.names[i]
     )[0])
     objects.append(axis.add_patch(plt.Circle(
         (
-            r[i, 0, 0] * targets[i]["path scale"],
-            r[i, 0, 1] * targets[i]["path scale"]
+            trails[i].latest[0],
+            trails[i].latest[1]
         ),
-        radii[i] * targets[i]["marker scale"],
-        color=targets[i]["color"],
+        radii[i] * targets.marker_scales[i],
+        color=targets.colors[i],
         alpha=0.5
     )))
 center = axis.plot(0, 0, marker="+", color="black")
@@ -142,32 +130,30 @@ axis.legend(bbox_to_anchor=(1, 0.5), loc="center left")
 def step(frame):
     global time, r, v
 
-    r = np.roll(r, 1, axis=1)
-    r[:, 0, :] = r[:, 1, :]
-
     for k in range(n):
         f = np.zeros((len(targets), len(targets), 3))
         for i in range(1, len(targets)):
             for j in range(i):
-                dr = r[j, 0, :]-r[i, 0, :]
+                dr = r[j, :]-r[i, :]
                 d = np.linalg.norm(dr)
                 g = gamma*masses[i]*masses[j]
                 f[i, j] = g*dr/d**3
 
         a = (np.sum(f, axis=1)-np.sum(f, axis=0))/masses[:, None]
-        r[:, 0, :] += v*dt+a/2*dt**2
+        r += v*dt+a/2*dt**2
         v += a*dt
 
-        time += datetime.timedelta(seconds=dt)
+    time += datetime.timedelta(seconds=dt*n)
 
     for i in range(len(targets)):
+        trails[i].append(r[i, :])
         paths[i].set_data(
-            r[i, :, 0]*targets[i]["path scale"],
-            r[i, :, 1]*targets[i]["path scale"]
+            trails[i].view[:, 0],
+            trails[i].view[:, 1]
         )
         objects[i].set_center((
-            r[i, 0, 0]*targets[i]["path scale"],
-            r[i, 0, 1]*targets[i]["path scale"]
+            trails[i].latest[0],
+            trails[i].latest[1]
         ))
     date.set_text(sp.dt2utc(time))
 
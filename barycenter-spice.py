@@ -1,5 +1,7 @@
 import datetime
 import spice as sp
+import plot as pl
+import catalogue as ct
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import numpy as np
@@ -11,43 +13,43 @@ import numpy as np
 start_time = datetime.datetime(2000, 1, 1, 0, 0, 0)
 dt = 1e6
 path_length = 1000
-targets = [
+targets = ct.Catalogue([
     {
         "id": 10,
         "name": "Sun",
         "color": "orange",
-        "marker scale": 200,
-        "path scale": 200
+        "marker_scale": 200,
+        "path_scale": 200
     },
     {
         "id": 5,
         "name": "Jupiter",
         "color": "blue",
-        "marker scale": 500,
-        "path scale": 1
+        "marker_scale": 500,
+        "path_scale": 1
     },
     # {
     #     "id": 6,
     #     "name": "Saturn",
     #     "color": "green",
-    #     "marker scale": 1500,
-    #     "path scale": 1
+    #     "marker_scale": 1500,
+    #     "path_scale": 1
     # },
     # {
     #     "id": 7,
     #     "name": "Uranus",
     #     "color": "brown",
-    #     "marker scale": 1500,
-    #     "path scale": 1
+    #     "marker_scale": 1500,
+    #     "path_scale": 1
     # },
     # {
     #     "id": 8,
     #     "name": "Neptune",
     #     "color": "brown",
-    #     "marker scale": 1500,
-    #     "path scale": 1
+    #     "marker_scale": 1500,
+    #     "path_scale": 1
     # }
-]
+])
 
 # Load kernels
 sp.furnsh("./kernels/naif0012.tls")
@@ -61,21 +63,12 @@ sp.set_observer(0)
 time = start_time
 
 # Obtain starting positions and parameters
-r = np.empty((0, path_length, 3))
-radii = []
-for target in targets:
-    position = sp.position(target["id"], time)
-    r = np.append(
-        r,
-        np.repeat(
-            position[None, None, :],
-            path_length, axis=1
-        ),
-        axis=0
-    )
-
-    radius = sp.radius(target["id"])
-    radii.append(radius)
+r = sp.states(targets.ids, (time,))[:, 0, :3]
+trails = [
+    pl.Trail(path_length, r[i], targets.path_scales[i])
+    for i in range(len(targets))
+]
+radii = targets.radii
 
 # Prepare display
 figure = plt.figure("Sun movement")
@@ -83,7 +76,7 @@ axis = figure.add_subplot(1, 1, 1, aspect="equal")
 
 #   Set axis limits
 distance = max(
-    np.linalg.norm(r[i, 0, :]) * targets[i]["path scale"]
+    np.linalg.norm(trails[i].latest)
     for i in range(len(targets))
 )
 axis.set_xlim(-distance * 1.5, distance * 1.5)
@@ -94,18 +87,18 @@ paths = []
 objects = []
 for i in range(len(targets)):
     paths.append(axis.plot(
-        r[i, :, 0] * targets[i]["path scale"],
-        r[i, :, 1] * targets[i]["path scale"],
-        color=targets[i]["color"],
-        label=targets[i]["name"]
+        trails[i].view[:, 0],
+        trails[i].view[:, 1],
+        color=targets.colors[i],
+        label=targets.names[i]
     )[0])
     objects.append(axis.add_patch(plt.Circle(
         (
-            r[i, 0, 0] * targets[i]["path scale"],
-            r[i, 0, 1] * targets[i]["path scale"]
+            trails[i].latest[0],
+            trails[i].latest[1]
         ),
-        radii[i] * targets[i]["marker scale"],
-        color=targets[i]["color"],
+        radii[i] * targets.marker_scales[i],
+        color=targets.colors[i],
         alpha=0.5
     )))
 center = axis.plot(0, 0, marker="+", color="black")
@@ -119,22 +112,19 @@ axis.legend(bbox_to_anchor=(1, 0.5), loc="center left")
 
 
 def step(frame):
-    global time, r
-
-    r = np.roll(r, 1, axis=1)
+    global time
 
-    for i in range(len(targets)):
-        position = sp.position(targets[i]["id"], time)
-        r[i, 0, :] = position
+    r = sp.states(targets.ids, (time,))[:, 0, :3]
 
     for i in range(len(targets)):
+        trails[i].append(r[i, :])
         paths[i].set_data(
-            r[i, :, 0] * targets[i]["path scale"],
-            r[i, :, 1] * targets[i]["path scale"]
+            trails[i].view[:, 0],
+            trails[i].view[:, 1]
         )
         objects[i].set_center((
-            r[i, 0, 0] * targets[i]["path scale"],
-            r[i, 0, 1] * targets[i]["path scale"]
+            trails[i].latest[0],
+            trails[i].latest[1]
         ))
     date.set_text(sp.dt2utc(time))
 
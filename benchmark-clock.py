@@ -0,0 +1,66 @@
+import datetime
+import timeit
+import numpy as np
+
+import simulation as sm
+
+# Benchmark settings
+#  n steps of dt [s] of a two body system are timed with both clocks
+#  Drift is measured after steps additions of a fractional step small_dt [s]
+start_time = datetime.datetime(2000, 1, 1, 0, 0, 0)
+dt = 1e3
+n = 10**5
+small_dt = 0.1234567
+steps = 10**6
+repeat = 5
+
+sim = sm.NBodySim(start_time)
+sim.add_object(2e30, np.zeros(3), np.zeros(3))
+sim.add_object(6e24, np.array((1.5e11, 0, 0)), np.array((0, 3e4, 0)))
+integrator = sim._integrator
+
+
+# Stand in for the integrator so only the time keeping is measured
+def idle(sim, time):
+    pass
+
+
+# Step loop with the original per step timedelta update
+def datetime_loop():
+    time = start_time
+    for k in range(n):
+        sim._integrator(sim, dt)
+        time += datetime.timedelta(seconds=dt)
+
+    return time
+
+
+# NBodySim.step, clock advance and per step bookkeeping included
+def clock_loop():
+    sim.step(dt, n)
+
+    return sim.time
+
+
+t_integrator = min(timeit.repeat(
+    lambda: integrator(sim, dt), number=1000, repeat=repeat
+)) / 1000
+sim._integrator = idle
+t_datetime = min(timeit.repeat(datetime_loop, number=1, repeat=repeat)) / n
+t_clock = min(timeit.repeat(clock_loop, number=1, repeat=repeat)) / n
+sim._integrator = integrator
+print(f"time keeping per step, integrator step {t_integrator * 1e6:.1f} us")
+print(f"  datetime: {t_datetime * 1e9:.0f} ns")
+print(f"  clock:    {t_clock * 1e9:.0f} ns")
+
+# Accumulated error of many small fractional steps
+time = start_time
+clock = sm.Clock(start_time)
+for k in range(steps):
+    time += datetime.timedelta(seconds=small_dt)
+    clock.advance(small_dt)
+exact = steps * small_dt
+
+print(f"{steps} steps of {small_dt} s")
+print(f"  datetime error: {(time - start_time).total_seconds() - exact:.3e} s")
+print(f"  clock error:    {clock.elapsed - exact:.3e} s")
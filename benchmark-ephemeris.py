@@ -0,0 +1,41 @@
+import datetime
+import time
+
+import spice as sp
+
+# Benchmark settings
+#  Every body in ids is queried at epochs epochs spaced dt [s] apart
+start_time = datetime.datetime(2000, 1, 1, 0, 0, 0)
+dt = 1e4
+epochs = 1000
+ids = (10, 5, 6, 7, 8)
+
+# Load kernels
+sp.furnsh((
+    "./kernels/naif0012.tls",
+    "./kernels/de432s.bsp"
+))
+sp.set_observer(0)
+
+times = [
+    start_time + datetime.timedelta(seconds=dt * k)
+    for k in range(epochs)
+]
+
+# Per-call path, one position and one velocity query per body and epoch
+sp.clear_cache()
+begin = time.perf_counter()
+for id in ids:
+    for t in times:
+        sp.position(id, t)
+        sp.velocity(id, t)
+per_call = time.perf_counter() - begin
+
+# Bulk path
+begin = time.perf_counter()
+result = sp.states(ids, times)
+bulk = time.perf_counter() - begin
+
+print(f"{len(ids)} bodies x {epochs} epochs -> {result.shape}")
+print(f"per-call: {per_call:.3f} s")
+print(f"bulk:     {bulk:.3f} s ({per_call / bulk:.1f}x)")
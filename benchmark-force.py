@@ -0,0 +1,54 @@
+import timeit
+import numpy as np
+
+import gravity as gr
+
+# Benchmark settings
+#  Accelerations are computed for every body count in sizes
+#  Each timing is the best of repeat runs of number evaluations
+sizes = (10, 100, 1000)
+repeat = 3
+seed = 0
+
+
+# Original double loop of NBodySim.step
+def reference(r, masses):
+    f = np.zeros((len(masses), len(masses), 3))
+    for i in range(1, len(masses)):
+        for j in range(i):
+            dr = r[j, :] - r[i, :]
+            d = np.linalg.norm(dr)
+            g = gr.GAMMA * masses[i] * masses[j]
+
+            f[i, j, :] = g * dr / d ** 3
+
+    return (np.sum(f, axis=1) - np.sum(f, axis=0)) / masses[:, None]
+
+
+rng = np.random.default_rng(seed)
+kernel = gr.DirectSummation()
+
+print(f"{'N':>6} {'loop [s]':>12} {'kernel [s]':>12} {'speedup':>9} {'max rel. error':>15}")
+for size in sizes:
+    r = rng.normal(scale=1e12, size=(size, 3))
+    masses = rng.uniform(1e20, 1e30, size=size)
+    a = np.empty((size, 3))
+
+    number = max(1, 10000 // size**2)
+    t_loop = min(timeit.repeat(
+        lambda: reference(r, masses),
+        number=number, repeat=repeat
+    )) / number
+    number = max(1, 1000000 // size**2)
+    t_kernel = min(timeit.repeat(
+        lambda: kernel(r, masses, out=a),
+        number=number, repeat=repeat
+    )) / number
+
+    expected = reference(r, masses)
+    error = np.max(
+        np.linalg.norm(a - expected, axis=1)
+        / np.linalg.norm(expected, axis=1)
+    )
+
+    print(f"{size:>6} {t_loop:>12.3e} {t_kernel:>12.3e} {t_loop / t_kernel:>9.1f} {error:>15.2e}")
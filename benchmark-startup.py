@@ -0,0 +1,46 @@
+import sys
+import subprocess
+
+# Benchmark settings
+#  Every measurement runs in a fresh interpreter, so nothing is imported yet
+#  Each timing is the best of repeat runs
+modules = ("numpy", "spiceypy", "gravity", "spice", "simulation")
+repeat = 5
+
+# Pure numerical run, two bodies added by hand and stepped
+simulation = """
+import datetime
+import numpy as np
+import simulation as sm
+sim = sm.NBodySim(datetime.datetime(2000, 1, 1))
+sim.add_object(2e30, np.zeros(3), np.zeros(3))
+sim.add_object(6e24, np.array((1.5e11, 0, 0)), np.array((0, 3e4, 0)))
+sim.step(1e3, 100)
+"""
+
+
+def measure(code):
+    script = "import time, sys\n" \
+        + "begin = time.perf_counter()\n" \
+        + code \
+        + "\nprint(time.perf_counter() - begin, 'spiceypy' in sys.modules)"
+
+    best = None
+    for k in range(repeat):
+        output = subprocess.run(
+            (sys.executable, "-c", script),
+            capture_output=True, text=True, check=True
+        ).stdout.split()
+        if best is None or float(output[0]) < best[0]:
+            best = (float(output[0]), output[1] == "True")
+
+    return best
+
+
+print(f"{'import':>12} {'time [ms]':>10} {'spiceypy loaded':>16}")
+for module in modules:
+    elapsed, loaded = measure(f"import {module}")
+    print(f"{module:>12} {elapsed * 1e3:>10.1f} {str(loaded):>16}")
+
+elapsed, loaded = measure(simulation)
+print(f"{'sim run':>12} {elapsed * 1e3:>10.1f} {str(loaded):>16}")
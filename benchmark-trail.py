@@ -0,0 +1,65 @@
+import timeit
+import matplotlib
+import numpy as np
+
+matplotlib.use("Agg")
+
+import plot as pl
+
+# Benchmark settings
+#  Every body circles the origin, frames are drawn on an Agg canvas
+#  Each timing is the best of repeat runs of number frames
+lengths = (10**3, 10**4, 10**5)
+bodies = 10
+number = 10
+repeat = 3
+
+
+def animation(length, resolution):
+    frame = 0
+
+    def step():
+        nonlocal frame
+
+        frame += 1
+        angle = frame * 2 * np.pi / length + np.arange(bodies)
+        radius = 1 + np.arange(bodies)
+
+        return np.column_stack((
+            radius * np.cos(angle),
+            radius * np.sin(angle),
+            0.1 * radius * np.sin(angle)
+        ))
+
+    plot = pl.NBodyPlot(step, fast=True, resolution=resolution)
+    for i in range(bodies):
+        plot.add(path_length=length, radius=0.1)
+    plot._setup(frames=1)
+    plot._figure.canvas.draw()
+
+    # Fill the trails with one full orbit
+    for k in range(length):
+        data = step()
+        for i in range(bodies):
+            plot._bodies[i].advance(data[i, :])
+
+    # Blitted frame, only the animated artists are redrawn
+    def draw():
+        for artist in plot._next(0):
+            plot._figure.draw_artist(artist)
+
+    return plot, draw
+
+
+print(f"{'length':>8} {'full [ms]':>10} {'decimated [ms]':>15} {'speedup':>8} {'vertices':>9}")
+for length in lengths:
+    _, full = animation(length, None)
+    plot, decimated = animation(length, 1.0)
+
+    t_full = min(timeit.repeat(full, number=number, repeat=repeat)) / number
+    t_decimated = min(timeit.repeat(
+        decimated, number=number, repeat=repeat
+    )) / number
+    vertices = sum(len(body.paths(plot._cells())[0]) for body in plot._bodies)
+
+    print(f"{length:>8} {t_full * 1e3:>10.2f} {t_decimated * 1e3:>15.2f} {t_full / t_decimated:>8.1f} {vertices:>9}")
@@ -0,0 +1,115 @@
+import numpy as np
+
+# One record per body, mass [kg] and radius [m] stay NaN until first used
+DTYPE = np.dtype([
+    ("id", np.int64),
+    ("name", "U32"),
+    ("color", "U32"),
+    ("marker_scale", float),
+    ("path_scale", float),
+    ("display", bool),
+    ("mass", float),
+    ("radius", float)
+])
+
+
+class Catalogue:
+    def __init__(self, bodies: list = ()):
+        self._records = np.zeros(len(bodies), dtype=DTYPE)
+        self._records["color"] = "blue"
+        self._records["marker_scale"] = 1.0
+        self._records["path_scale"] = 1.0
+        self._records["display"] = True
+        self._records["mass"] = np.nan
+        self._records["radius"] = np.nan
+        for i, body in enumerate(bodies):
+            for field, value in body.items():
+                self._records[field][i] = value
+
+        self._index()
+
+    def _index(self):
+        self._ids = {int(id): i for i, id in enumerate(self._records["id"])}
+        self._names = {
+            str(name).lower(): i
+            for i, name in enumerate(self._records["name"])
+        }
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __getitem__(self, id: int):
+        return self._records[self.index(id)]
+
+    def __contains__(self, id: int):
+        return int(id) in self._ids
+
+    def index(self, id: int):
+        if int(id) not in self._ids:
+            raise ValueError(f"Body {id} is not in the catalogue")
+
+        return self._ids[int(id)]
+
+    def find(self, name: str):
+        if name.lower() not in self._names:
+            raise ValueError(f"Body {name} is not in the catalogue")
+
+        return self._records[self._names[name.lower()]]
+
+    def select(self, ids: list):
+        catalogue = Catalogue()
+        catalogue._records = self._records[[self.index(id) for id in ids]]
+        catalogue._index()
+
+        return catalogue
+
+    def _constant(self, field: str, query):
+        # Kernel lookups happen once per body, later calls read the cache
+        values = self._records[field]
+        for i in np.flatnonzero(np.isnan(values)):
+            values[i] = query(int(self._records["id"][i]))
+
+        return values
+
+    @property
+    def records(self):
+        return self._records
+
+    @property
+    def ids(self):
+        return self._records["id"]
+
+    @property
+    def names(self):
+        return self._records["name"]
+
+    @property
+    def colors(self):
+        return self._records["color"]
+
+    @property
+    def marker_scales(self):
+        return self._records["marker_scale"]
+
+    @property
+    def path_scales(self):
+        return self._records["path_scale"]
+
+    @property
+    def display(self):
+        return self._records["display"]
+
+    @property
+    def masses(self):
+        import spice as sp
+
+        return self._constant("mass", sp.mass)
+
+    @property
+    def radii(self):
+        import spice as sp
+
+        return self._constant("radius", sp.radius)
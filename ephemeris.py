@@ -0,0 +1,198 @@
+import datetime
+import numpy as np
+
+
+def _chebyshev(x: np.array, degree: int):
+    # T_j(x) and dT_j/dx for j = 0..degree along the last axis
+    t = np.empty((*x.shape, degree + 1))
+    dt = np.empty((*x.shape, degree + 1))
+    t[..., 0] = 1
+    dt[..., 0] = 0
+    if degree > 0:
+        t[..., 1] = x
+        dt[..., 1] = 1
+    for j in range(2, degree + 1):
+        t[..., j] = 2 * x * t[..., j - 1] - t[..., j - 2]
+        dt[..., j] = 2 * t[..., j - 1] + 2 * x * dt[..., j - 1] \
+            - dt[..., j - 2]
+
+    return t, dt
+
+
+def fit(
+        path: str,
+        ids: list,
+        start: datetime.datetime,
+        end: datetime.datetime,
+        interval: float = 8 * 86400,
+        degree: int = 12,
+        reference: str = None,
+        observer: int = None
+):
+    # Kernels are only needed while fitting
+    import spice as sp
+
+    if reference is None:
+        reference = sp.REFERENCE
+    if observer is None:
+        observer = sp.OBSERVER
+
+    ids = np.array(ids, dtype=int)
+    et_0 = sp.dt2et(start)
+    count = int(np.ceil((sp.dt2et(end) - et_0) / interval))
+    middle = et_0 + interval * (np.arange(count) + 0.5)
+
+    # Sample every interval at the Chebyshev nodes
+    nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+    ets = middle[:, None] + nodes[None, :] * interval / 2
+    r = sp.states(ids, ets.ravel(), reference, observer)[..., :3]
+    r = r.reshape(len(ids), count, degree + 1, 3)
+
+    # Discrete Chebyshev transform of the samples
+    t, _ = _chebyshev(nodes, degree)
+    coefficients = np.einsum("bckd,kj->bcdj", r, t) * 2 / (degree + 1)
+    coefficients[..., 0] /= 2
+
+    # Error bound from points halfway between the nodes
+    checks = np.cos(np.pi * np.arange(1, degree + 1) / (degree + 1))
+    ets = middle[:, None] + checks[None, :] * interval / 2
+    expected = sp.states(ids, ets.ravel(), reference, observer)
+    expected = expected.reshape(len(ids), count, degree, 6)
+    t, dt = _chebyshev(checks, degree)
+    r = np.einsum("bcdj,kj->bckd", coefficients, t)
+    v = np.einsum("bcdj,kj->bckd", coefficients, dt) * 2 / interval
+    position_error = np.max(
+        np.linalg.norm(r - expected[..., :3], axis=-1),
+        axis=(1, 2)
+    )
+    velocity_error = np.max(
+        np.linalg.norm(v - expected[..., 3:], axis=-1),
+        axis=(1, 2)
+    )
+
+    np.savez(
+        path,
+        ids=ids,
+        reference=reference,
+        observer=observer,
+        et=et_0,
+        interval=interval,
+        coefficients=coefficients,
+        position_error=position_error,
+        velocity_error=velocity_error,
+        **sp.deltet()
+    )
+
+    return Ephemeris(path)
+
+
+class Ephemeris:
+    def __init__(self, path: str):
+        import spice as sp
+
+        with np.load(path) as data:
+            self._ids = data["ids"]
+            self._reference = str(data["reference"])
+            self._observer = int(data["observer"])
+            self._et = float(data["et"])
+            self._interval = float(data["interval"])
+            self._coefficients = data["coefficients"]
+            self._position_error = data["position_error"]
+            self._velocity_error = data["velocity_error"]
+            self._deltet = {name: data[name] for name in sp.DELTET}
+
+        self._index = {int(id): i for i, id in enumerate(self._ids)}
+        self._leapseconds = None
+
+    def _evaluate(self, ids, et):
+        rows = np.array([self._index[int(id)] for id in np.ravel(ids)])
+        et = np.atleast_1d(np.asarray(et, dtype=float))
+        if np.any(et < self.start) or np.any(et > self.end):
+            raise ValueError("Epoch outside of the fitted span")
+
+        # Interval of every epoch and its position inside, scaled to [-1, 1]
+        k = np.minimum(
+            ((et - self._et) // self._interval).astype(int),
+            self._coefficients.shape[1] - 1
+        )
+        x = 2 * (et - self._et - (k + 0.5) * self._interval) \
+            / self._interval
+        t, dt = _chebyshev(x, self._coefficients.shape[-1] - 1)
+
+        c = self._coefficients[rows[:, None], k[None, :]]
+        r = np.einsum("bedj,ej->bed", c, t)
+        v = np.einsum("bedj,ej->bed", c, dt)
+
+        return r, v * 2 / self._interval
+
+    def et(self, time: datetime.datetime | list):
+        # Converted with the constants saved at fit time, so playback
+        # needs neither spiceypy nor a leapseconds kernel
+        import spice as sp
+
+        if self._leapseconds is None:
+            self._leapseconds = sp.leapseconds(self._deltet)
+
+        return sp.dt2et(time, self._leapseconds)
+
+    def states(self, ids: list, et: np.array):
+        r, v = self._evaluate(ids, et)
+
+        return np.concatenate((r, v), axis=-1)
+
+    def _segment(self, id: int, et: float):
+        # Scalar lookup, kept free of array bookkeeping for single queries
+        offset = et - self._et
+        if offset < 0 or offset > self.end - self._et:
+            raise ValueError("Epoch outside of the fitted span")
+
+        k = min(int(offset // self._interval), self._coefficients.shape[1] - 1)
+        x = 2 * (offset - (k + 0.5) * self._interval) / self._interval
+
+        return self._coefficients[self._index[id], k], x
+
+    def position(self, id: int, et: float):
+        c, x = self._segment(id, et)
+        t = [1.0, x]
+        for j in range(2, c.shape[-1]):
+            t.append(2 * x * t[-1] - t[-2])
+
+        return c @ t[:c.shape[-1]]
+
+    def velocity(self, id: int, et: float):
+        c, x = self._segment(id, et)
+        t = [1.0, x]
+        dt = [0.0, 1.0]
+        for j in range(2, c.shape[-1]):
+            dt.append(2 * t[-1] + 2 * x * dt[-1] - dt[-2])
+            t.append(2 * x * t[-1] - t[-2])
+
+        return c @ dt[:c.shape[-1]] * 2 / self._interval
+
+    @property
+    def ids(self):
+        return self._ids
+
+    @property
+    def reference(self):
+        return self._reference
+
+    @property
+    def observer(self):
+        return self._observer
+
+    @property
+    def start(self):
+        return self._et
+
+    @property
+    def end(self):
+        return self._et + self._interval * self._coefficients.shape[1]
+
+    @property
+    def position_error(self):
+        return dict(zip(self._ids.tolist(), self._position_error))
+
+    @property
+    def velocity_error(self):
+        return dict(zip(self._ids.tolist(), self._velocity_error))
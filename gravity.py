@@ -0,0 +1,283 @@
+import numpy as np
+
+GAMMA = 6.67e-11
+
+
+class DirectSummation:
+    def __init__(self):
+        # Scratch buffers, reused while the body count stays the same
+        self._dr = np.empty((0, 0, 3))
+        self._d = np.empty((0, 0))
+
+    def __call__(
+            self,
+            r: np.array,
+            masses: np.array,
+            out: np.array = None
+    ):
+        if out is None:
+            out = np.empty_like(r)
+
+        # Only bodies with mass act as sources
+        sources = np.flatnonzero(masses)
+        if len(sources) < len(masses):
+            rs = r[..., sources, :]
+            masses = masses[sources]
+        else:
+            rs = r
+
+        # Leading axes of r are independent systems sharing the masses
+        n = (*r.shape[:-1], rs.shape[-2])
+        if self._d.shape != n:
+            self._dr = np.empty((*n, 3))
+            self._d = np.empty(n)
+
+        # Pairwise separations dr[i, j] = rs[j] - r[i]
+        dr = np.subtract(
+            rs[..., None, :, :], r[..., :, None, :],
+            out=self._dr
+        )
+
+        # Coupling G*m[j]/|dr[i, j]|^3, zero for a body with itself
+        d = np.einsum("...ijk,...ijk->...ij", dr, dr, out=self._d)
+        np.power(d, 1.5, out=d)
+        np.divide(GAMMA * masses, d, out=d, where=d > 0)
+
+        return np.einsum("...ij,...ijk->...ik", d, dr, out=out)
+
+    def reset(self):
+        self._dr = np.empty((0, 0, 3))
+        self._d = np.empty((0, 0))
+
+    def restore(self, state: dict):
+        pass
+
+    @property
+    def settings(self):
+        return {}
+
+    @property
+    def state(self):
+        return {}
+
+
+class BarnesHut:
+    def __init__(
+            self,
+            theta: float = 0.5,
+            leaf_size: int = 8,
+            rebuild: int = 10,
+            check: bool = False
+    ):
+        self._theta = theta
+        self._leaf_size = leaf_size
+        self._rebuild = rebuild
+        self._check = check
+        self._direct = DirectSummation()
+        self._errors = None
+
+        # Octree, every node covers a contiguous range of self._order
+        self._sources = None
+        self._order = None
+        self._start = None
+        self._end = None
+        self._children = None
+        self._built_size = None
+        self._age = 0
+
+    def __call__(
+            self,
+            r: np.array,
+            masses: np.array,
+            out: np.array = None
+    ):
+        if out is None:
+            out = np.empty_like(r)
+        out[...] = 0
+
+        sources = np.flatnonzero(masses)
+        if len(sources) == 0:
+            return out
+        if self._order is None or self._age >= self._rebuild \
+                or not np.array_equal(sources, self._sources):
+            self._build(r, sources)
+        mass, com, size = self._refit(r, masses)
+        if np.sum(size) > 2 * np.sum(self._built_size):
+            self._build(r, sources)
+            mass, com, size = self._refit(r, masses)
+        self._age += 1
+
+        stack = [(0, np.arange(len(r)))]
+        while stack:
+            node, targets = stack.pop()
+
+            # Leaves are summed directly, skipping the target itself
+            if not self._children[node]:
+                members = self._order[self._start[node]:self._end[node]]
+                dr = r[None, members, :] - r[targets, None, :]
+                d = np.einsum("ijk,ijk->ij", dr, dr) ** 1.5
+                g = np.divide(
+                    GAMMA * masses[None, members], d,
+                    out=np.zeros_like(d), where=d > 0
+                )
+                out[targets] += np.einsum("ij,ijk->ik", g, dr)
+                continue
+
+            # Distant targets see the node as a point mass
+            dr = com[node] - r[targets]
+            d2 = np.einsum("ij,ij->i", dr, dr)
+            far = size[node] ** 2 < self._theta ** 2 * d2
+            out[targets[far]] += GAMMA * mass[node] * dr[far] \
+                / d2[far, None] ** 1.5
+
+            near = targets[~far]
+            if len(near):
+                for child in self._children[node]:
+                    stack.append((child, near))
+
+        if self._check:
+            expected = self._direct(r, masses)
+            self._errors = np.linalg.norm(out - expected, axis=1) \
+                / np.linalg.norm(expected, axis=1)
+
+        return out
+
+    def _build(self, r: np.array, sources: np.array):
+        self._sources = sources
+        self._order = sources.copy()
+        self._start = []
+        self._end = []
+        self._children = []
+        self._age = 0
+
+        stack = [(0, len(sources), 0, None)]
+        while stack:
+            start, end, depth, parent = stack.pop()
+            node = len(self._start)
+            self._start.append(start)
+            self._end.append(end)
+            self._children.append([])
+            if parent is not None:
+                self._children[parent].append(node)
+
+            if end - start <= self._leaf_size or depth >= 32:
+                continue
+
+            # Sort the members into octants around the cell center
+            members = self._order[start:end]
+            lo = np.min(r[members], axis=0)
+            hi = np.max(r[members], axis=0)
+            if np.all(lo == hi):
+                continue
+            octant = (r[members] > (lo + hi) / 2) @ np.array((1, 2, 4))
+            permutation = np.argsort(octant, kind="stable")
+            self._order[start:end] = members[permutation]
+
+            bounds = np.searchsorted(octant[permutation], np.arange(9))
+            for i in range(8):
+                if bounds[i + 1] > bounds[i]:
+                    stack.append((
+                        start + bounds[i],
+                        start + bounds[i + 1],
+                        depth + 1,
+                        node
+                    ))
+
+        self._start = np.array(self._start)
+        self._end = np.array(self._end)
+        _, _, self._built_size = self._refit(r, None)
+
+    def _refit(self, r: np.array, masses: np.array):
+        # Node mass, center of mass and extent from the current positions
+        rs = r[self._order]
+        bounds = np.ravel(np.column_stack((self._start, self._end)))
+        padded = np.append(rs, rs[-1:], axis=0)
+        lo = np.minimum.reduceat(padded, bounds)[::2]
+        hi = np.maximum.reduceat(padded, bounds)[::2]
+        size = np.max(hi - lo, axis=1)
+        if masses is None:
+            return None, None, size
+
+        ms = masses[self._order]
+        cm = np.concatenate(((0,), np.cumsum(ms)))
+        cmr = np.concatenate((
+            np.zeros((1, 3)),
+            np.cumsum(ms[:, None] * rs, axis=0)
+        ))
+        mass = cm[self._end] - cm[self._start]
+        com = (cmr[self._end] - cmr[self._start]) / mass[:, None]
+
+        return mass, com, size
+
+    def reset(self):
+        self._order = None
+        self._sources = None
+
+    def restore(self, state: dict):
+        if not state:
+            self.reset()
+            return
+
+        self._sources = state["sources"]
+        self._order = state["order"]
+        self._start = state["start"]
+        self._end = state["end"]
+        offsets = state["offsets"]
+        self._children = [
+            state["children"][offsets[i]:offsets[i + 1]].tolist()
+            for i in range(len(offsets) - 1)
+        ]
+        self._built_size = state["built_size"]
+        self._age = int(state["age"])
+
+    @property
+    def settings(self):
+        return {
+            "theta": self._theta,
+            "leaf_size": self._leaf_size,
+            "rebuild": self._rebuild,
+            "check": self._check
+        }
+
+    @property
+    def state(self):
+        # Tree of the last build, so a restored run refits the same tree
+        if self._order is None:
+            return {}
+
+        return {
+            "sources": self._sources,
+            "order": self._order,
+            "start": self._start,
+            "end": self._end,
+            "children": np.array(
+                [child for children in self._children for child in children],
+                dtype=np.int64
+            ),
+            "offsets": np.cumsum(
+                [0] + [len(children) for children in self._children]
+            ),
+            "built_size": self._built_size,
+            "age": self._age
+        }
+
+    @property
+    def theta(self):
+        return self._theta
+
+    @property
+    def errors(self):
+        return self._errors
+
+    @property
+    def error(self):
+        if self._errors is None:
+            return None
+
+        return np.max(self._errors)
+
+
+SOLVERS = {
+    "direct": DirectSummation,
+    "barnes-hut": BarnesHut
+}
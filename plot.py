@@ -1,6 +1,99 @@
+import os
+import time
+import queue
+import tempfile
+import threading
+import subprocess
+import collections
+import concurrent.futures as cf
 import numpy as np
+import matplotlib as mpl
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.animation import FuncAnimation
+from matplotlib.collections import LineCollection, EllipseCollection
+from matplotlib.lines import Line2D
+
+
+class Trail:
+    def __init__(
+            self,
+            length: int,
+            position: np.array,
+            scale: float = 1.0
+    ):
+        # Every point is stored twice, so the last length points are
+        # always one contiguous slice of the buffer
+        self._length = length
+        self._scale = scale
+        self._head = 0
+        self._buffer = np.repeat(
+            position[None, :] * scale,
+            repeats=2 * length,
+            axis=0
+        )
+
+        # Per point and plot, whether it left the screen cell of the point
+        # before it, laid out like the buffer
+        self._cells = None
+        self._moved = np.zeros((2 * length, 2), dtype=bool)
+
+    def __len__(self):
+        return self._length
+
+    def append(self, position: np.array):
+        self._head = (self._head + 1) % self._length
+        np.multiply(position, self._scale, out=self._buffer[self._head])
+        self._buffer[self._head + self._length] = self._buffer[self._head]
+
+        if self._cells is not None:
+            self._moved[self._head] = self._changed(
+                self._buffer[self._head],
+                self._buffer[self._head + self._length - 1]
+            )
+            self._moved[self._head + self._length] = self._moved[self._head]
+
+    def _changed(self, points: np.array, previous: np.array):
+        return np.stack((
+            np.any(
+                np.floor(points[..., :2] / self._cells[0])
+                != np.floor(previous[..., :2] / self._cells[0]),
+                axis=-1
+            ),
+            np.any(
+                np.floor(points[..., ::2] / self._cells[1])
+                != np.floor(previous[..., ::2] / self._cells[1]),
+                axis=-1
+            )
+        ), axis=-1)
+
+    def keep(self, cells: np.array):
+        # Points that start a new screen cell on either plot, plus the
+        # oldest and newest, recomputed in full only when the cells change
+        if self._cells is None or not np.array_equal(cells, self._cells):
+            self._cells = np.array(cells)
+            view = self.view
+            moved = np.ones((self._length, 2), dtype=bool)
+            moved[1:] = self._changed(view[1:], view[:-1])
+            moved = np.roll(moved, self._head + 1, axis=0)
+            self._moved[:self._length] = moved
+            self._moved[self._length:] = moved
+
+        keep = self._moved[self._head + 1:self._head + self._length + 1].copy()
+        keep[0] = True
+        keep[-1] = True
+
+        return keep
+
+    @property
+    def view(self):
+        # Oldest to newest
+        return self._buffer[self._head + 1:self._head + self._length + 1]
+
+    @property
+    def latest(self):
+        return self._buffer[self._head + self._length]
 
 
 class Body:
@@ -19,30 +112,35 @@ class Body:
         self._radius = radius
 
         self._r = None
+        self._trail = None
         self._path_1 = None
         self._path_2 = None
         self._marker_1 = None
         self._marker_2 = None
 
-    def plot(self, axis_1, axis_2, position):
+    def track(self, position):
         # Initializing path values
-        self._r = np.repeat(
-            position[None, :],
-            repeats=self._path_length,
-            axis=0
+        self._r = np.array(position, dtype=float)
+        self._trail = Trail(
+            self._path_length,
+            self._r,
+            scale=self._path_scale
         )
 
+    def plot(self, axis_1, axis_2, position):
+        self.track(position)
+
         # Drawing to plot 1
         self._path_1 = axis_1.plot(
-            self._r[0, 0],
-            self._r[0, 1],
+            self._r[0],
+            self._r[1],
             color=self._color,
             label=self._label
         )[0]
         self._marker_1 = axis_1.add_patch(plt.Circle(
             (
-                self._r[0, 0],
-                self._r[0, 1]
+                self._r[0],
+                self._r[1]
             ),
             radius=self._radius,
             color=self._color,
@@ -51,48 +149,75 @@ class Body:
 
         # Drawing to plot 2
         self._path_2 = axis_2.plot(
-            self._r[0, 0],
-            self._r[0, 2],
+            self._r[0],
+            self._r[2],
             color=self._color,
             label=self._label
         )[0]
         self._marker_2 = axis_2.add_patch(plt.Circle(
             (
-                self._r[0, 0],
-                self._r[0, 2]
+                self._r[0],
+                self._r[2]
             ),
             radius=self._radius,
             color=self._color,
             alpha=0.5
         ))
 
-    def step(
+    def advance(
             self,
             position: np.array
     ):
-        self._r = np.roll(self._r, 1, axis=0)
-        self._r[0, :] = position
+        self._r[:] = position
+        self._trail.append(position)
 
-        self._path_1.set_data(
-            self._r[:, 0] * self._path_scale,
-            self._r[:, 1] * self._path_scale
-        )
-        self._marker_1.set_center((
-            self._r[0, 0] * self._path_scale,
-            self._r[0, 1] * self._path_scale
-        ))
-        self._path_2.set_data(
-            self._r[:, 0] * self._path_scale,
-            self._r[:, 2] * self._path_scale
-        )
-        self._marker_2.set_center((
-            self._r[0, 0] * self._path_scale,
-            self._r[0, 2] * self._path_scale
-        ))
+    def paths(self, cells: tuple = None):
+        # Trail projected onto both plots, optionally decimated to cells
+        path = self._trail.view
+        if cells is None:
+            return path[:, :2], path[:, ::2]
+
+        keep = self._trail.keep(cells)
+
+        return path[keep[:, 0], :2], path[keep[:, 1], ::2]
+
+    def step(
+            self,
+            position: np.array,
+            cells: tuple = None
+    ):
+        self.advance(position)
+        path_1, path_2 = self.paths(cells)
+        latest = self._trail.latest
+
+        self._path_1.set_data(path_1[:, 0], path_1[:, 1])
+        self._marker_1.set_center((latest[0], latest[1]))
+        self._path_2.set_data(path_2[:, 0], path_2[:, 1])
+        self._marker_2.set_center((latest[0], latest[2]))
 
     @property
     def position(self):
-        return self._r[0, :]
+        return self._r
+
+    @property
+    def trail(self):
+        return self._trail
+
+    @property
+    def label(self):
+        return self._label
+
+    @property
+    def color(self):
+        return self._color
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @property
+    def path_length(self):
+        return self._path_length
 
 
 class NBodyPlot:
@@ -102,15 +227,29 @@ class NBodyPlot:
             title: str = "Trajectory",
             path_length: int = 1000,
             limits: tuple = None,
-            limit_scale: float = 1.5
+            limit_scale: float = 1.5,
+            fast: bool = False,
+            background: bool = False,
+            buffer: int = 16,
+            skip: bool = True,
+            resolution: float = 1.0
     ):
         self._step = step
         self._title = title
         self._path_length = path_length
         self._limits = limits
         self._limit_scale = limit_scale
+        self._fast = fast
+        self._background = background
+        self._buffer = buffer
+        self._skip = skip
+        self._resolution = resolution
 
         self._bodies = []
+        self._queue = None
+        self._stop = None
+        self._worker = None
+        self._blocking = False
 
     def add(
             self,
@@ -128,45 +267,177 @@ class NBodyPlot:
             radius=radius
         ))
 
+    def add_catalogue(
+            self,
+            catalogue,
+            label: str = "{}",
+            colors: list = None
+    ):
+        if colors is None:
+            colors = catalogue.colors
+        radii = catalogue.radii * catalogue.marker_scales
+
+        for i in np.flatnonzero(catalogue.display):
+            self.add(
+                label=label.format(catalogue.names[i]),
+                color=colors[i],
+                path_scale=catalogue.path_scales[i],
+                path_length=self._path_length,
+                radius=radii[i]
+            )
+
+    def _produce(self):
+        # Runs ahead of the animation until the queue is full
+        while not self._stop.is_set():
+            try:
+                data = np.array(self._step(), dtype=float)
+            except Exception as error:
+                data = error
+
+            while not self._stop.is_set():
+                try:
+                    self._queue.put(data, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+
+            if isinstance(data, Exception):
+                return
+
+    def _pull(self):
+        if self._queue is None:
+            return [self._step()]
+
+        frames = []
+        if self._blocking:
+            frames.append(self._queue.get())
+        elif self._skip and self._queue.full():
+            # Rendering fell behind, catch up to the newest frame
+            try:
+                while True:
+                    frames.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+        else:
+            try:
+                frames.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+        for data in frames:
+            if isinstance(data, Exception):
+                raise data
+
+        return frames
+
     def _next(self, frame):
-        data = self._step()
+        frames = self._pull()
 
-        for i in range(len(self._bodies)):
-            self._bodies[i].step(data[i, :])
+        # Skipped frames still extend the trails
+        for data in frames[:-1]:
+            for i in range(len(self._bodies)):
+                self._bodies[i].advance(data[i, :])
 
-    def _setup(
-            self,
-            frames: int = 500,
-            interval: int = 50
-    ):
-        # Gather initial data
-        data = self._step()
+        if not self._fast:
+            if frames:
+                cells = self._cells()
+                for i in range(len(self._bodies)):
+                    self._bodies[i].step(frames[-1][i, :], cells)
+            return
+
+        if frames:
+            for i in range(len(self._bodies)):
+                self._bodies[i].advance(frames[-1][i, :])
+
+        return self._draw()
+
+    def _cells(self):
+        if self._resolution is None:
+            return None
+
+        # Data extent of resolution pixels on either plot
+        cells = []
+        for axis in (self._axis_1, self._axis_2):
+            box = axis.get_window_extent()
+            x = axis.get_xlim()
+            y = axis.get_ylim()
+            cells.append(self._resolution * np.abs((
+                (x[1] - x[0]) / box.width,
+                (y[1] - y[0]) / box.height
+            )))
+
+        return cells
+
+    def _draw(self):
+        # One collection per axis for all trails and one for all markers
+        cells = self._cells()
+        paths = [body.paths(cells) for body in self._bodies]
+        self._paths_1.set_segments([path[0] for path in paths])
+        self._paths_2.set_segments([path[1] for path in paths])
+        latest = np.array([body.trail.latest for body in self._bodies])
+        self._markers_1.set_offsets(latest[:, :2])
+        self._markers_2.set_offsets(latest[:, ::2])
+
+        return (
+            self._paths_1,
+            self._paths_2,
+            self._markers_1,
+            self._markers_2
+        )
+
+    def _collections(self):
+        colors = [body.color for body in self._bodies]
+        diameters = [2 * body.radius for body in self._bodies]
+
+        for axis in (self._axis_1, self._axis_2):
+            paths = axis.add_collection(LineCollection([], colors=colors))
+            markers = axis.add_collection(EllipseCollection(
+                widths=diameters,
+                heights=diameters,
+                angles=0,
+                units="xy",
+                offsets=np.zeros((len(self._bodies), 2)),
+                offset_transform=axis.transData,
+                facecolors=colors,
+                edgecolors=colors,
+                alpha=0.5
+            ))
+            yield paths, markers
 
+    def _bounds(self, data: np.array):
+        radius = np.max(np.linalg.norm(data[:len(self._bodies), :2], axis=1))
+
+        return [
+            radius * self._limit_scale,
+            radius * self._limit_scale,
+            radius * self._limit_scale
+        ]
+
+    def _layout(self, figure, data: np.array):
         # Prepare display
-        self._figure = plt.figure(self._title)
+        self._figure = figure
         self._axis_1 = self._figure.add_subplot(1, 2, 1, aspect="equal")
         self._axis_2 = self._figure.add_subplot(1, 2, 2, aspect="equal")
 
         # Display initial position
         for i in range(len(self._bodies)):
-            self._bodies[i].plot(
-                self._axis_1,
-                self._axis_2,
-                position=data[i, :]
-            )
+            if self._fast:
+                self._bodies[i].track(data[i, :])
+            else:
+                self._bodies[i].plot(
+                    self._axis_1,
+                    self._axis_2,
+                    position=data[i, :]
+                )
+        if self._fast:
+            (
+                (self._paths_1, self._markers_1),
+                (self._paths_2, self._markers_2)
+            ) = self._collections()
 
         # Calculate axis limits
         if self._limits is None:
-            # Calculate axis limits
-            radius = max(
-                np.linalg.norm(body.position[:2])
-                for body in self._bodies
-            )
-            self._limits = [
-                radius * self._limit_scale,
-                radius * self._limit_scale,
-                radius * self._limit_scale
-            ]
+            self._limits = self._bounds(data)
 
         self._axis_1.set_xlim(-self._limits[0], self._limits[0])
         self._axis_1.set_ylim(-self._limits[1], self._limits[1])
@@ -174,16 +445,60 @@ class NBodyPlot:
         self._axis_2.set_ylim(-self._limits[2], self._limits[2])
 
         # Display legend
-        self._axis_2.legend(bbox_to_anchor=(1, 0.5), loc="center left")
+        handles = None
+        if self._fast:
+            handles = [
+                Line2D([], [], color=body.color, label=body.label)
+                for body in self._bodies if body.label
+            ]
+        self._axis_2.legend(
+            handles=handles,
+            bbox_to_anchor=(1, 0.5),
+            loc="center left"
+        )
+
+        # Final axis boxes, the trail decimation depends on them
+        self._axis_1.apply_aspect()
+        self._axis_2.apply_aspect()
+        if self._fast:
+            self._draw()
+
+    def _setup(
+            self,
+            frames: int = 500,
+            interval: int = 50
+    ):
+        # Gather initial data
+        data = self._step()
+        self._layout(plt.figure(self._title), data)
 
         # Create animation
         self._animation = FuncAnimation(
             fig=self._figure,
             func=self._next,
             frames=frames,
-            interval=interval
+            interval=interval,
+            blit=self._fast
         )
 
+        # Simulation producer, started once the initial state is drawn
+        if self._background:
+            self._queue = queue.Queue(maxsize=self._buffer)
+            self._stop = threading.Event()
+            self._worker = threading.Thread(target=self._produce, daemon=True)
+            self._worker.start()
+            self._figure.canvas.mpl_connect("close_event", self.close)
+
+    def close(self, event=None):
+        if self._worker is None:
+            return
+
+        self._animation.event_source.stop()
+        self._stop.set()
+        self._worker.join()
+        self._worker = None
+        self._queue = None
+
     def run(self):
         self._setup()
         plt.show()
@@ -194,4 +509,148 @@ class NBodyPlot:
             dpi: int = 300
     ):
         self._setup()
-        self._animation.save(path, dpi=dpi)
+        self._blocking = True
+        try:
+            self._animation.save(path, dpi=dpi)
+        finally:
+            self._blocking = False
+            self.close()
+
+    def export(
+            self,
+            path: str,
+            frames: int = 500,
+            processes: int = None,
+            size: tuple = (1280, 720),
+            dpi: int = 100,
+            codec: str = None,
+            fps: int = 20,
+            chunk: int = 10
+    ):
+        begin = time.perf_counter()
+        if processes is None:
+            processes = os.cpu_count()
+        if codec is None:
+            codec = mpl.rcParams["animation.codec"]
+
+        # The trajectory is computed once, frame 0 is the initial state
+        trajectory = np.array(
+            [self._step() for _ in range(frames + 1)],
+            dtype=float
+        )
+        if self._limits is None:
+            self._limits = self._bounds(trajectory[0])
+        settings = {
+            "title": self._title,
+            "path_length": self._path_length,
+            "limits": self._limits,
+            "limit_scale": self._limit_scale,
+            "fast": self._fast,
+            "resolution": self._resolution
+        }
+
+        encoder = None
+
+        def write(future):
+            nonlocal encoder
+
+            (width, height), images = future.result()
+            if encoder is None:
+                encoder = _encoder(path, width, height, codec, fps)
+            encoder.stdin.write(images)
+
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "trajectory.npy")
+            np.save(source, trajectory)
+
+            # Chunks are rendered in parallel and written in order, with a
+            # bounded number in flight
+            try:
+                with cf.ProcessPoolExecutor(max_workers=processes) as pool:
+                    futures = collections.deque()
+                    for first in range(1, frames + 1, chunk):
+                        futures.append(pool.submit(
+                            _render,
+                            source,
+                            self._bodies,
+                            settings,
+                            size,
+                            dpi,
+                            first,
+                            min(first + chunk, frames + 1)
+                        ))
+                        if len(futures) >= 2 * processes:
+                            write(futures.popleft())
+                    while futures:
+                        write(futures.popleft())
+            finally:
+                if encoder is not None:
+                    encoder.stdin.close()
+                    encoder.wait()
+
+        if encoder is not None and encoder.returncode != 0:
+            raise RuntimeError(f"Encoder exited with code {encoder.returncode}")
+
+        return frames / (time.perf_counter() - begin)
+
+
+def _encoder(path: str, width: int, height: int, codec: str, fps: int):
+    return subprocess.Popen(
+        [
+            mpl.rcParams["animation.ffmpeg_path"], "-y",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-r", str(fps),
+            "-i", "-",
+            "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-vcodec", codec,
+            "-pix_fmt", "yuv420p",
+            path
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def _render(
+        path: str,
+        bodies: list,
+        settings: dict,
+        size: tuple,
+        dpi: int,
+        first: int,
+        last: int
+):
+    trajectory = np.load(path, mmap_mode="r")
+
+    # Trails only reach path_length frames back, older frames are skipped
+    frame = max(0, first - max(body.path_length for body in bodies))
+
+    def step():
+        nonlocal frame
+
+        data = trajectory[frame]
+        frame += 1
+
+        return data
+
+    plot = NBodyPlot(step, **settings)
+    plot._bodies = bodies
+    figure = Figure(figsize=(size[0] / dpi, size[1] / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    plot._layout(figure, step())
+    canvas.draw()
+    while frame < first:
+        data = step()
+        for i in range(len(bodies)):
+            bodies[i].advance(data[i, :])
+
+    images = []
+    for k in range(first, last):
+        plot._next(k)
+        canvas.draw()
+        images.append(np.asarray(canvas.buffer_rgba())[..., :3].tobytes())
+
+    return canvas.get_width_height(), b"".join(images)
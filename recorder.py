@@ -0,0 +1,264 @@
+import os
+import ast
+import datetime
+import numpy as np
+
+HEADER_SIZE = 128
+
+
+def _header(shape: tuple, dtype: np.dtype):
+    # Fixed size .npy header, rewritten in place as the file grows
+    header = repr({
+        "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        "fortran_order": False,
+        "shape": tuple(shape)
+    })
+    header = header.ljust(HEADER_SIZE - 11) + "\n"
+
+    return b"\x93NUMPY\x01\x00" \
+        + np.uint16(len(header)).tobytes() + header.encode("latin1")
+
+
+def _shape(file):
+    file.seek(10)
+    header = file.read(HEADER_SIZE - 10).decode("latin1")
+
+    return ast.literal_eval(header)["shape"]
+
+
+class Recorder:
+    def __init__(
+            self,
+            path: str,
+            decimation: int = 1,
+            buffer: int = 1024,
+            append: bool = False
+    ):
+        self._path = path
+        self._decimation = decimation
+        self._buffer_size = buffer
+        self._append = append
+
+        self._frames = 0
+        self._files = None
+        self._last = None
+        self._epochs = None
+        self._r = None
+        self._v = None
+        self._k = 0
+
+    def open(self, start: datetime.datetime, ids: list):
+        os.makedirs(self._path, exist_ok=True)
+        n = len(ids)
+        names = ("epochs", "positions", "velocities")
+        paths = [os.path.join(self._path, name + ".npy") for name in names]
+
+        if self._append and os.path.exists(paths[0]):
+            self._files = [open(path, "r+b") for path in paths]
+            self._frames = _shape(self._files[0])[0]
+            if _shape(self._files[1])[1] != n:
+                raise ValueError("Body count differs from the recording")
+            if self._frames:
+                self._files[0].seek(-8, os.SEEK_END)
+                self._last = np.frombuffer(self._files[0].read(8))[0]
+        else:
+            np.save(os.path.join(self._path, "start.npy"),
+                    np.datetime64(start, "us"))
+            np.save(os.path.join(self._path, "ids.npy"), np.array(
+                [-1 if id is None else id for id in ids], dtype=np.int64
+            ))
+            self._files = [open(path, "w+b") for path in paths]
+            self._frames = 0
+            self._last = None
+
+        # Chunk buffers, written out whenever they fill up
+        self._epochs = np.empty(self._buffer_size)
+        self._r = np.empty((self._buffer_size, n, 3))
+        self._v = np.empty((self._buffer_size, n, 3))
+        self._k = 0
+        self._write_headers()
+
+    def wants(self, epoch: float, substep: int):
+        # Decimation follows the simulation's substep count, which survives
+        # checkpoints, and epochs already in an appended recording are skipped
+        if self._last is not None and epoch <= self._last:
+            return False
+
+        return substep % self._decimation == 0
+
+    def record(
+            self,
+            epoch: float,
+            position: np.array,
+            velocity: np.array,
+            substep: int
+    ):
+        if not self.wants(epoch, substep):
+            return
+
+        self._epochs[self._k] = epoch
+        self._r[self._k] = position
+        self._v[self._k] = velocity
+        self._k += 1
+
+        if self._k == self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._files is None or self._k == 0:
+            return
+
+        for file, data in zip(
+                self._files,
+                (self._epochs, self._r, self._v)
+        ):
+            file.seek(0, os.SEEK_END)
+            file.write(data[:self._k].tobytes())
+
+        self._frames += self._k
+        self._k = 0
+        self._write_headers()
+
+    def _write_headers(self):
+        n = self._r.shape[1]
+        shapes = ((self._frames,), (self._frames, n, 3), (self._frames, n, 3))
+        for file, shape in zip(self._files, shapes):
+            file.seek(0)
+            file.write(_header(shape, np.float64))
+            file.flush()
+
+    def close(self):
+        if self._files is None:
+            return
+
+        self.flush()
+        for file in self._files:
+            file.close()
+        self._files = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def frames(self):
+        return self._frames + self._k
+
+
+class Reader:
+    def __init__(self, path: str):
+        self._path = path
+        self._epochs = np.load(os.path.join(path, "epochs.npy"), mmap_mode="r")
+        self._r = np.load(os.path.join(path, "positions.npy"), mmap_mode="r")
+        self._v = np.load(os.path.join(path, "velocities.npy"), mmap_mode="r")
+        self._ids = np.load(os.path.join(path, "ids.npy"))
+        self._start = np.load(os.path.join(path, "start.npy")).item()
+
+        # Evenly spaced epochs map to frame indices arithmetically
+        self._step = None
+        if len(self._epochs) > 1:
+            step = (self._epochs[-1] - self._epochs[0]) \
+                / (len(self._epochs) - 1)
+            if np.allclose(np.diff(self._epochs), step, rtol=1e-9, atol=0):
+                self._step = step
+
+    def __len__(self):
+        return len(self._epochs)
+
+    def _elapsed(self, epoch: float | datetime.datetime):
+        if isinstance(epoch, datetime.datetime):
+            return (epoch - self._start).total_seconds()
+
+        return epoch
+
+    def index(self, epoch: float | datetime.datetime):
+        epoch = self._elapsed(epoch)
+        if self._step is not None:
+            i = round((epoch - self._epochs[0]) / self._step)
+        else:
+            i = np.searchsorted(self._epochs, epoch)
+            if i > 0 and (i == len(self._epochs)
+                          or epoch - self._epochs[i - 1]
+                          < self._epochs[i] - epoch):
+                i -= 1
+
+        return int(min(max(i, 0), len(self._epochs) - 1))
+
+    def _columns(self, bodies: list):
+        if bodies is None:
+            return slice(None)
+
+        columns = []
+        for id in bodies:
+            matches = np.flatnonzero(self._ids == id)
+            if len(matches) == 0:
+                raise ValueError(f"Body {id} is not in the recording")
+            columns.append(matches[0])
+
+        # Consecutive columns stay a slice so the window is a view
+        if np.all(np.diff(columns) == 1):
+            return slice(columns[0], columns[-1] + 1)
+
+        return np.array(columns)
+
+    def window(
+            self,
+            bodies: list = None,
+            start: float | datetime.datetime = None,
+            end: float | datetime.datetime = None
+    ):
+        first = 0 if start is None else self.index(start)
+        last = len(self) if end is None else self.index(end) + 1
+        columns = self._columns(bodies)
+
+        return (
+            self._epochs[first:last],
+            self._r[first:last, columns],
+            self._v[first:last, columns]
+        )
+
+    def playback(
+            self,
+            bodies: list = None,
+            start: float | datetime.datetime = None,
+            stride: int = 1
+    ):
+        columns = self._columns(bodies)
+        frame = 0 if start is None else self.index(start)
+
+        # Step function for plot.NBodyPlot, holds the last frame at the end
+        def step():
+            nonlocal frame
+
+            position = self._r[frame, columns]
+            frame = min(frame + stride, len(self) - 1)
+
+            return position
+
+        return step
+
+    @property
+    def ids(self):
+        return self._ids
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def epochs(self):
+        return self._epochs
+
+    @property
+    def position(self):
+        return self._r
+
+    @property
+    def velocity(self):
+        return self._v
@@ -0,0 +1,151 @@
+import os
+import time
+import datetime
+import concurrent.futures as cf
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+import spice as sp
+import simulation as sm
+
+
+class Job:
+    def __init__(
+            self,
+            start: datetime.datetime,
+            dt: float,
+            n: int,
+            targets: list,
+            integrator: str = "taylor",
+            gravity: str = "direct",
+            reference: str = None,
+            observer: int = None
+    ):
+        self.start = start
+        self.dt = dt
+        self.n = n
+        self.targets = list(targets)
+        self.integrator = integrator
+        self.gravity = gravity
+        self.reference = reference
+        self.observer = observer
+
+
+class Result:
+    def __init__(
+            self,
+            index: int,
+            job: Job,
+            position: np.array = None,
+            velocity: np.array = None,
+            time: datetime.datetime = None,
+            elapsed: float = 0.0,
+            worker: int = None,
+            error: str = None
+    ):
+        self.index = index
+        self.job = job
+        self.position = position
+        self.velocity = velocity
+        self.time = time
+        self.elapsed = elapsed
+        self.worker = worker
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def _initialize(kernels: tuple, observer: int):
+    sp.furnsh(kernels)
+    if observer is not None:
+        sp.set_observer(observer)
+
+
+def _run(index: int, job: Job):
+    begin = time.perf_counter()
+    try:
+        sim = sm.NBodySim(
+            job.start,
+            integrator=job.integrator,
+            gravity=job.gravity
+        )
+        sim.add_naifs(
+            job.targets,
+            reference=job.reference,
+            observer=job.observer
+        )
+        sim.step(job.dt, job.n)
+    except Exception as error:
+        return Result(
+            index, job,
+            elapsed=time.perf_counter() - begin,
+            worker=os.getpid(),
+            error=repr(error)
+        )
+
+    return Result(
+        index, job,
+        position=sim.position,
+        velocity=sim.velocity,
+        time=sim.time,
+        elapsed=time.perf_counter() - begin,
+        worker=os.getpid()
+    )
+
+
+def run(
+        jobs: list,
+        kernels: tuple = (),
+        processes: int = None,
+        observer: int = None
+):
+    jobs = list(jobs)
+    if processes is None:
+        processes = os.cpu_count()
+    pending = set(range(len(jobs)))
+
+    # Shared pool, every worker loads the kernels once
+    with cf.ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_initialize,
+            initargs=(kernels, observer)
+    ) as pool:
+        futures = {pool.submit(_run, i, jobs[i]): i for i in pending}
+        for future in cf.as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                continue
+            except Exception as error:
+                result = Result(i, jobs[i], error=repr(error))
+
+            pending.discard(i)
+            yield result
+
+    # A worker died, the rest is run in isolated pools
+    pending = sorted(pending)
+    while pending:
+        batch, pending = pending[:processes], pending[processes:]
+        pools = {}
+        for i in batch:
+            pool = cf.ProcessPoolExecutor(
+                max_workers=1,
+                initializer=_initialize,
+                initargs=(kernels, observer)
+            )
+            pools[pool.submit(_run, i, jobs[i])] = (i, pool)
+
+        for future in cf.as_completed(pools):
+            i, pool = pools[future]
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                result = Result(i, jobs[i], error="Worker process terminated")
+            except Exception as error:
+                result = Result(i, jobs[i], error=repr(error))
+            pool.shutdown()
+            yield result
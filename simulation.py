@@ -1,88 +1,705 @@
 import numpy as np
 import datetime as dt
-import spice as sp
+import math
+import copy
+import json
+import os
+import gravity as gr
 
-GAMMA = 6.67e-11
+GAMMA = gr.GAMMA
+CENTRAL = 10
+KEPLER_ITERATIONS = 50
+
+
+def taylor(sim, time: float):
+    sim._accelerate()
+    sim._r += sim._v * time + sim._a / 2 * time ** 2
+    sim._v += sim._a * time
+    sim._fresh = False
+
+
+def leapfrog(sim, time: float):
+    # Kick-drift-kick, the closing acceleration is reused by the next step
+    if not sim._fresh:
+        sim._accelerate()
+
+    sim._v += sim._a * (time / 2)
+    sim._r += sim._v * time
+    sim._accelerate()
+    sim._v += sim._a * (time / 2)
+
+
+def composition(weights: tuple):
+    def integrator(sim, time: float):
+        for weight in weights:
+            leapfrog(sim, weight * time)
+
+    return integrator
+
+
+def _stumpff(z: np.array):
+    c = np.empty_like(z)
+    s = np.empty_like(z)
+
+    # Series expansion near zero to avoid cancellation
+    small = np.abs(z) < 0.1
+    zs = z[small]
+    c[small] = 1/2 - zs/24 * (1 - zs/30 * (1 - zs/56 * (1 - zs/90)))
+    s[small] = 1/6 - zs/120 * (1 - zs/42 * (1 - zs/72 * (1 - zs/110)))
+
+    elliptic = z >= 0.1
+    x = np.sqrt(z[elliptic])
+    c[elliptic] = (1 - np.cos(x)) / x ** 2
+    s[elliptic] = (x - np.sin(x)) / x ** 3
+
+    hyperbolic = z <= -0.1
+    x = np.sqrt(-z[hyperbolic])
+    c[hyperbolic] = (np.cosh(x) - 1) / x ** 2
+    s[hyperbolic] = (np.sinh(x) - x) / x ** 3
+
+    return c, s
+
+
+def kepler(r: np.array, v: np.array, mu: float, time: float):
+    # Two-body propagation in universal variables, vectorized over bodies
+    r0 = np.linalg.norm(r, axis=-1)
+    rv = np.einsum("...k,...k->...", r, v)
+    v2 = np.einsum("...k,...k->...", v, v)
+    sqrt_mu = np.sqrt(mu)
+    alpha = 2 / r0 - v2 / mu
+
+    x = sqrt_mu * np.abs(alpha) * time
+    for k in range(KEPLER_ITERATIONS):
+        z = alpha * x ** 2
+        c, s = _stumpff(z)
+        f = rv / sqrt_mu * x ** 2 * c + (1 - alpha * r0) * x ** 3 * s \
+            + r0 * x - sqrt_mu * time
+        df = rv / sqrt_mu * x * (1 - z * s) + (1 - alpha * r0) * x ** 2 * c \
+            + r0
+        dx = f / df
+        x = x - dx
+
+        if np.all(np.abs(dx) <= 1e-15 * np.abs(x)):
+            break
+
+    z = alpha * x ** 2
+    c, s = _stumpff(z)
+    f = 1 - x ** 2 / r0 * c
+    g = time - x ** 3 * s / sqrt_mu
+    r_new = f[..., None] * r + g[..., None] * v
+
+    r1 = np.linalg.norm(r_new, axis=-1)
+    df = sqrt_mu / (r1 * r0) * (z * s - 1) * x
+    dg = 1 - x ** 2 / r1 * c
+    v_new = df[..., None] * r + dg[..., None] * v
+
+    return r_new, v_new
+
+
+def wisdom_holman(sim, time: float):
+    # Democratic heliocentric splitting around the central body
+    c = sim._central()
+    m = sim._source_masses
+    mu = GAMMA * m[c]
+    planets = np.arange(len(m)) != c
+    mp = np.where(planets, m, 0.0)
+    total = np.sum(m)
+
+    r_cm = np.einsum("i,...ik->...k", m, sim._r) / total
+    v_cm = np.einsum("i,...ik->...k", m, sim._v) / total
+    q = sim._r - sim._r[..., c, None, :]
+    u = sim._v - v_cm[..., None, :]
+    a = np.empty_like(q)
+
+    # Interaction kick, central momentum jump, Kepler drift, jump, kick
+    u += sim._gravity(q, mp, out=a) * (time / 2)
+    jump = np.einsum("i,...ik->...k", mp, u) / m[c] * (time / 2)
+    q[..., planets, :] += jump[..., None, :]
+    q[..., planets, :], u[..., planets, :] = kepler(
+        q[..., planets, :], u[..., planets, :], mu, time
+    )
+    jump = np.einsum("i,...ik->...k", mp, u) / m[c] * (time / 2)
+    q[..., planets, :] += jump[..., None, :]
+    u += sim._gravity(q, mp, out=a) * (time / 2)
+
+    # Back to barycentric positions and velocities
+    r_c = r_cm + v_cm * time - np.einsum("i,...ik->...k", mp, q) / total
+    sim._r[...] = q + r_c[..., None, :]
+    sim._v[...] = u + v_cm[..., None, :]
+    sim._v[..., c, :] = v_cm - np.einsum("i,...ik->...k", mp, u) / m[c]
+    sim._fresh = False
+
+
+INTEGRATORS = {
+    "taylor": taylor,
+    "leapfrog": leapfrog,
+    "yoshida4": composition((
+        1 / (2 - 2 ** (1 / 3)),
+        -2 ** (1 / 3) / (2 - 2 ** (1 / 3)),
+        1 / (2 - 2 ** (1 / 3))
+    )),
+    "yoshida6": composition((
+        0.784513610477557263819,
+        0.235573213359358133684,
+        -1.17767998417887100695,
+        1.31518632068391121888,
+        -1.17767998417887100695,
+        0.235573213359358133684,
+        0.784513610477557263819
+    )),
+    "wisdom-holman": wisdom_holman
+}
+
+# Dormand-Prince 5(4) tableau, the last row gives the 5th order solution
+DORMAND_PRINCE = (
+    (1/5,),
+    (3/40, 9/40),
+    (44/45, -56/15, 32/9),
+    (19372/6561, -25360/2187, 64448/6561, -212/729),
+    (9017/3168, -355/33, 46732/5247, 49/176, -5103/18656),
+    (35/384, 0, 500/1113, 125/192, -2187/6784, 11/84)
+)
+DORMAND_PRINCE_ERROR = (
+    71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40
+)
+
+
+class Clock:
+    def __init__(self, start: dt.datetime):
+        # Elapsed time split into whole seconds and a fraction in [0, 1)
+        self._start = start
+        self._et = None
+        self._seconds = 0
+        self._fraction = 0.0
+
+    def advance(self, seconds: float):
+        total = self._fraction + seconds
+        whole = math.floor(total)
+        self._seconds += whole
+        self._fraction = total - whole
+
+    @property
+    def start(self):
+        return self._start
+
+    @property
+    def elapsed(self):
+        return self._seconds + self._fraction
+
+    @property
+    def time(self):
+        return self._start + dt.timedelta(
+            seconds=self._seconds,
+            microseconds=round(self._fraction * 1e6)
+        )
+
+    @property
+    def et(self):
+        # The ephemeris backend is only loaded by simulations that use it
+        import spice as sp
+
+        if self._et is None:
+            self._et = sp.dt2et(self._start)
+
+        return (self._et + self._seconds) + self._fraction
+
+
+class StepStatistics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.accepted = 0
+        self.rejected = 0
+        self.evaluations = 0
+        self._epochs = []
+        self._sizes = []
+
+    def record(self, epoch: float, size: float):
+        self.accepted += 1
+        self._epochs.append(epoch)
+        self._sizes.append(size)
+
+    @property
+    def epochs(self):
+        return np.array(self._epochs)
+
+    @property
+    def sizes(self):
+        return np.array(self._sizes)
+
+    @property
+    def min(self):
+        return np.min(np.abs(self._sizes))
+
+    @property
+    def max(self):
+        return np.max(np.abs(self._sizes))
+
+    @property
+    def mean(self):
+        return np.mean(np.abs(self._sizes))
 
 
 class NBodySim:
     def __init__(
             self,
-            start: dt.datetime
+            start: dt.datetime,
+            integrator: str = "taylor",
+            gravity: str = "direct"
     ):
-        self._time = start
-        self._masses = np.empty((0,))
-        self._display = []
-        self._a = np.empty((0, 3))
-        self._r = np.empty((0, 3))
-        self._v = np.empty((0, 3))
+        self._clock = Clock(start)
+        self._ids = []
+        self._count = 0
+        self._next_handle = 0
+
+        # Per body arrays with spare capacity at the end, self._masses,
+        # self._r and the others are views of the rows in use
+        self._storage = {
+            "masses": np.empty((0,)),
+            "source_masses": np.empty((0,)),
+            "display": np.empty((0,), dtype=bool),
+            "handles": np.empty((0,), dtype=np.int64),
+            "a": np.empty((0, 3)),
+            "r": np.empty((0, 3)),
+            "v": np.empty((0, 3))
+        }
+        self._view()
+
+        if isinstance(gravity, str):
+            if gravity not in gr.SOLVERS:
+                raise ValueError(f"Unknown gravity solver: {gravity}")
+            gravity = gr.SOLVERS[gravity]()
+        self._gravity = gravity
+        self._fresh = False
+        self._h = None
+        self._statistics = StepStatistics()
+        self._recorders = []
+        self._substeps = 0
+        self._checkpoint = None
+
+        self.integrator = integrator
 
     def __len__(self):
-        return len(self._masses)
+        return self._count
+
+    def __getstate__(self):
+        # Views are rebuilt from the storage after copying or unpickling,
+        # and the integrator from its name since compositions are closures
+        state = self.__dict__.copy()
+        for name in self._storage:
+            del state["_" + name]
+        del state["_integrator"]
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._integrator = INTEGRATORS[self._integrator_name]
+        self._view()
+
+    def _view(self):
+        for name, array in self._storage.items():
+            setattr(self, "_" + name, array[:self._count])
+
+    def _reserve(self, count: int):
+        capacity = len(self._storage["masses"])
+        if count <= capacity:
+            return
+
+        # Doubling keeps repeated insertion at amortized constant cost
+        capacity = max(count, 2 * capacity, 16)
+        for name, array in self._storage.items():
+            grown = np.zeros((capacity, *array.shape[1:]), dtype=array.dtype)
+            grown[:self._count] = array[:self._count]
+            self._storage[name] = grown
 
     def step(self, time: int, n: int = 1):
         for k in range(n):
-            f = np.zeros((len(self), len(self), 3))
-            for i in range(1, len(self)):
-                for j in range(i):
-                    dr = self._r[j, :] - self._r[i, :]
-                    d = np.linalg.norm(dr)
-                    g = GAMMA * self._masses[i] * self._masses[j]
+            self._integrator(self, time)
+            self._clock.advance(time)
+            self._completed()
+
+    def _completed(self):
+        self._substeps += 1
+
+        for recorder in self._recorders:
+            recorder.record(
+                self._clock.elapsed, self._r, self._v, self._substeps
+            )
+
+        if self._checkpoint is not None \
+                and self._substeps % self._checkpoint[1] == 0:
+            self.save(self._checkpoint[0])
+
+    def checkpoint(self, path: str, interval: int = None):
+        if interval is None:
+            self._checkpoint = None
+        else:
+            self._checkpoint = (path, interval)
+
+    def save(self, path: str):
+        gravity = next(
+            name for name, solver in gr.SOLVERS.items()
+            if isinstance(self._gravity, solver)
+        )
+
+        # An interrupted save leaves the previous checkpoint intact
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            np.savez(
+                file,
+                masses=self._masses,
+                source_masses=self._source_masses,
+                ids=np.array([0 if id is None else id for id in self._ids],
+                             dtype=np.int64),
+                named=np.array([id is not None for id in self._ids],
+                               dtype=bool),
+                display=self._display,
+                handles=self._handles,
+                next_handle=self._next_handle,
+                r=self._r,
+                v=self._v,
+                a=self._a,
+                fresh=self._fresh,
+                start=np.datetime64(self._clock.start, "us"),
+                seconds=self._clock._seconds,
+                fraction=self._clock._fraction,
+                h=np.nan if self._h is None else self._h,
+                substeps=self._substeps,
+                integrator=self._integrator_name,
+                gravity=gravity,
+                settings=json.dumps(self._gravity.settings),
+                **{
+                    "gravity_" + name: value
+                    for name, value in self._gravity.state.items()
+                }
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            gravity = gr.SOLVERS[str(data["gravity"])](
+                **json.loads(str(data["settings"]))
+            )
+            sim = cls(
+                data["start"].item(),
+                integrator=str(data["integrator"]),
+                gravity=gravity
+            )
+
+            count = len(data["masses"])
+            sim._reserve(count)
+            sim._count = count
+            sim._view()
+
+            sim._masses[...] = data["masses"]
+            sim._source_masses[...] = data["source_masses"]
+            sim._ids = [
+                int(id) if named else None
+                for id, named in zip(data["ids"], data["named"])
+            ]
+            sim._display[...] = data["display"]
+            sim._r[...] = data["r"]
+            sim._v[...] = data["v"]
+            sim._a[...] = data["a"]
+            if "handles" in data:
+                sim._handles[...] = data["handles"]
+                sim._next_handle = int(data["next_handle"])
+            else:
+                sim._handles[...] = np.arange(count)
+                sim._next_handle = count
+            sim._fresh = bool(data["fresh"])
+            sim._clock._seconds = int(data["seconds"])
+            sim._clock._fraction = float(data["fraction"])
+            sim._h = None if np.isnan(data["h"]) else float(data["h"])
+            sim._substeps = int(data["substeps"])
+            sim._gravity.restore({
+                name[len("gravity_"):]: data[name]
+                for name in data.files if name.startswith("gravity_")
+            })
+
+        return sim
+
+    def attach(self, recorder):
+        recorder.open(self._clock.start, self._ids)
+        recorder.record(self._clock.elapsed, self._r, self._v, self._substeps)
+        self._recorders.append(recorder)
+
+    def detach(self, recorder):
+        self._recorders.remove(recorder)
+        recorder.close()
+
+    def integrate(self, end: dt.datetime, tolerance: float = 1e-9):
+        # The target is fixed on the clock so a restart sees the same steps
+        target = (end - self._clock.start).total_seconds()
+        remaining = target - self._clock.elapsed
+
+        if not self._fresh:
+            self._accelerate()
+        kr = [self._v.copy()]
+        kv = [self._a.copy()]
+
+        # Initial step from the ratio of position and velocity scales
+        h = self._h
+        if h is None or not np.isfinite(h) or h == 0:
+            h = 0.01 * np.linalg.norm(self._r) / np.linalg.norm(self._v)
+            if not np.isfinite(h) or h == 0:
+                h = remaining
+        h = np.copysign(h, remaining)
+
+        done = remaining == 0
+        while not done:
+            size = h
+            remaining = target - self._clock.elapsed
+            last = abs(size) >= abs(remaining)
+            if last:
+                size = remaining
 
-                    f[i, j, :] = g * dr / d ** 3
+            # Runge-Kutta stages, the last one is the new state
+            for row in DORMAND_PRINCE:
+                r = self._r + size * sum(c * k for c, k in zip(row, kr))
+                v = self._v + size * sum(c * k for c, k in zip(row, kv))
+                kr.append(v)
+                kv.append(self._gravity(r, self._source_masses))
+            self._statistics.evaluations += len(DORMAND_PRINCE)
 
-            self._a = (np.sum(f, axis=1) - np.sum(f, axis=0)) \
-                      / self._masses[:, None]
-            self._r += self._v * time + self._a / 2 * time ** 2
-            self._v += self._a * time
+            # Error estimate relative to the body's own scale
+            er = size * sum(c * k for c, k in zip(DORMAND_PRINCE_ERROR, kr))
+            ev = size * sum(c * k for c, k in zip(DORMAND_PRINCE_ERROR, kv))
+            scale_r = np.maximum(
+                np.linalg.norm(self._r, axis=-1),
+                np.linalg.norm(r, axis=-1)
+            ) + 1
+            scale_v = np.maximum(
+                np.linalg.norm(self._v, axis=-1),
+                np.linalg.norm(v, axis=-1)
+            ) + 1
+            error = max(
+                np.max(np.linalg.norm(er, axis=-1) / scale_r),
+                np.max(np.linalg.norm(ev, axis=-1) / scale_v)
+            ) / tolerance
 
-        self._time += dt.timedelta(seconds=time * n)
+            if error <= 1:
+                self._r[...] = r
+                self._v[...] = v
+                self._a[...] = kv[-1]
+                self._clock.advance(size)
+                self._statistics.record(self._clock.elapsed, size)
+                kr = [kr[-1]]
+                kv = [kv[-1]]
+                done = last
+            else:
+                self._statistics.rejected += 1
+                kr = kr[:1]
+                kv = kv[:1]
+
+            if error == 0:
+                h *= 5
+            else:
+                h *= min(5.0, max(0.2, 0.9 * error ** -0.2))
+            self._h = abs(h)
+
+            if error <= 1:
+                self._completed()
+
+    def _accelerate(self):
+        self._gravity(self._r, self._source_masses, out=self._a)
+        self._fresh = True
+
+    def _central(self):
+        if CENTRAL in self._ids:
+            return self._ids.index(CENTRAL)
+
+        return int(np.argmax(self._masses))
+
+    def _unrecorded(self):
+        # Recordings have a fixed body count
+        if self._recorders:
+            raise ValueError("Bodies cannot change while a recorder is attached")
 
     def add_object(
             self,
             mass: int,
             position: np.array,
             velocity: np.array,
-            display: bool = True
+            display: bool = True,
+            id: int = None,
+            test: bool = False
+    ):
+        return int(self.add_objects(
+            masses=[mass],
+            positions=np.asarray(position)[None, :],
+            velocities=np.asarray(velocity)[None, :],
+            display=display,
+            ids=[id],
+            test=test
+        )[0])
+
+    def add_objects(
+            self,
+            masses: np.array,
+            positions: np.array,
+            velocities: np.array,
+            display: bool = True,
+            ids: list = None,
+            test: bool = False
     ):
-        self._masses = np.append(self._masses, mass)
-        self._display.append(display)
-        self._r = np.append(self._r, position[None, :], axis=0)
-        self._v = np.append(self._v, velocity[None, :], axis=0)
+        self._unrecorded()
+        masses = np.asarray(masses, dtype=float)
+        first = self._count
+        self._reserve(first + len(masses))
+        self._count += len(masses)
+        self._view()
+
+        handles = np.arange(self._next_handle, self._next_handle + len(masses))
+        self._next_handle += len(masses)
+
+        self._masses[first:] = masses
+        self._source_masses[first:] = np.where(test, 0.0, masses)
+        self._display[first:] = display
+        self._handles[first:] = handles
+        self._r[first:] = positions
+        self._v[first:] = velocities
+        self._a[first:] = 0
+        self._ids.extend([None] * len(masses) if ids is None else ids)
+        self._fresh = False
+
+        return handles
+
+    def index(self, handles: int):
+        # Handles only grow and removal keeps the order, so they stay sorted
+        rows = np.searchsorted(self._handles, handles)
+        if self._count == 0 or not np.all(
+                np.take(self._handles, rows, mode="clip") == handles
+        ):
+            raise ValueError(f"Unknown body handle: {handles}")
+
+        return rows
+
+    def remove(self, handles: int):
+        self._unrecorded()
+        keep = np.ones(self._count, dtype=bool)
+        keep[self.index(handles)] = False
+        count = int(np.count_nonzero(keep))
+
+        # Remaining bodies are compacted in place, keeping their order
+        for array in self._storage.values():
+            array[:count] = array[:self._count][keep]
+        self._ids = [id for id, kept in zip(self._ids, keep) if kept]
+        self._count = count
+        self._view()
+        self._fresh = False
 
     def add_naif(
             self,
             id: int,
             display: bool = True,
             reference: str = None,
-            observer: int = None
+            observer: int = None,
+            test: bool = False
     ):
-        mass = sp.mass(id)
-        position = sp.position(
-            id, self._time,
+        return int(self.add_naifs(
+            [id],
+            display=display,
             reference=reference,
-            observer=observer
-        )
-        velocity = sp.velocity(
-            id, self._time,
+            observer=observer,
+            test=test
+        )[0])
+
+    def add_naifs(
+            self,
+            ids: list,
+            display: bool = True,
+            reference: str = None,
+            observer: int = None,
+            test: bool = False,
+            skip: bool = False
+    ):
+        import spice as sp
+
+        ids = [int(id) for id in ids]
+        masses, states, missing = sp.bodies(
+            ids, self.et,
             reference=reference,
             observer=observer
         )
+        if missing and not skip:
+            raise ValueError(f"Missing from the loaded kernels: {missing}")
 
-        self.add_object(
-            mass=mass,
-            position=position,
-            velocity=velocity,
-            display=display
+        # Bodies that were found are added in one allocation, the handles
+        # of skipped ones are -1
+        missing = set(missing)
+        found = np.array([id not in missing for id in ids], dtype=bool)
+        handles = np.full(len(ids), -1)
+        handles[found] = self.add_objects(
+            masses=masses[found],
+            positions=states[found, :3],
+            velocities=states[found, 3:6],
+            display=np.broadcast_to(display, len(ids))[found],
+            ids=[id for id in ids if id not in missing],
+            test=np.broadcast_to(test, len(ids))[found]
+        )
+
+        return handles
+
+    def add_catalogue(
+            self,
+            catalogue,
+            reference: str = None,
+            observer: int = None,
+            test: bool = False
+    ):
+        return self.add_naifs(
+            catalogue.ids,
+            display=catalogue.display,
+            reference=reference,
+            observer=observer,
+            test=test
         )
 
     @property
     def mass(self):
         return self._masses
 
+    @property
+    def integrator(self):
+        return self._integrator_name
+
+    @integrator.setter
+    def integrator(self, name: str):
+        if name not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {name}")
+
+        self._integrator_name = name
+        self._integrator = INTEGRATORS[name]
+
+    @property
+    def test(self):
+        return self._source_masses == 0
+
+    @property
+    def gravity(self):
+        return self._gravity
+
+    @property
+    def handles(self):
+        return self._handles
+
+    @property
+    def statistics(self):
+        return self._statistics
+
     @property
     def time(self):
-        return self._time
+        return self._clock.time
+
+    @property
+    def et(self):
+        return self._clock.et
 
     @property
     def position(self):
@@ -91,3 +708,88 @@ class NBodySim:
     @property
     def velocity(self):
         return self._v[self._display, :]
+
+
+class NBodyEnsemble:
+    def __init__(
+            self,
+            sim: NBodySim,
+            members: int,
+            integrator: str = None
+    ):
+        self._clock = copy.copy(sim._clock)
+        self._masses = sim.mass.copy()
+        self._source_masses = sim._source_masses.copy()
+        self._ids = list(sim._ids)
+        self._display = sim._display.copy()
+        self._r = np.repeat(sim._r[None, :, :], members, axis=0)
+        self._v = np.repeat(sim._v[None, :, :], members, axis=0)
+        self._a = np.empty_like(self._r)
+        self._gravity = gr.DirectSummation()
+        self._fresh = False
+
+        if integrator is None:
+            integrator = sim.integrator
+        self.integrator = integrator
+
+    def __len__(self):
+        return len(self._r)
+
+    def perturb(
+            self,
+            position: float = 0.0,
+            velocity: float = 0.0,
+            seed: int = None
+    ):
+        rng = np.random.default_rng(seed)
+        self._r += rng.normal(scale=position, size=self._r.shape)
+        self._v += rng.normal(scale=velocity, size=self._v.shape)
+        self._fresh = False
+
+    def step(self, time: int, n: int = 1):
+        for k in range(n):
+            self._integrator(self, time)
+
+        self._clock.advance(time * n)
+
+    def _accelerate(self):
+        self._gravity(self._r, self._source_masses, out=self._a)
+        self._fresh = True
+
+    def _central(self):
+        if CENTRAL in self._ids:
+            return self._ids.index(CENTRAL)
+
+        return int(np.argmax(self._masses))
+
+    @property
+    def integrator(self):
+        return self._integrator_name
+
+    @integrator.setter
+    def integrator(self, name: str):
+        if name not in INTEGRATORS:
+            raise ValueError(f"Unknown integrator: {name}")
+
+        self._integrator_name = name
+        self._integrator = INTEGRATORS[name]
+
+    @property
+    def mass(self):
+        return self._masses
+
+    @property
+    def time(self):
+        return self._clock.time
+
+    @property
+    def et(self):
+        return self._clock.et
+
+    @property
+    def position(self):
+        return self._r[:, self._display, :]
+
+    @property
+    def velocity(self):
+        return self._v[:, self._display, :]
@@ -1,18 +1,122 @@
-import spiceypy as sp
 import numpy as np
 import datetime
+import functools
+import hashlib
+import atexit
+import bisect
+import math
+import os
 
 GAMMA = 6.67e-11
 OBSERVER = 10
 REFERENCE = "ECLIPJ2000"
+CACHE_SIZE = 4096
+J2000 = np.datetime64("2000-01-01T12:00:00", "us")
+CACHE_DIRECTORY = os.path.join(os.path.expanduser("~"), ".cache", "nbody")
+DELTET = {"delta_at": 1000, "delta_t_a": 1, "k": 1, "eb": 1, "m": 2}
+
+# Leap second table and TDB constants, read from the pool once per load
+_leapseconds = None
+
+# spiceypy, imported along with the first kernels handed to CSPICE
+sp = None
+SpiceyError = None
+
+# Kernels not yet handed to CSPICE, and the digest of every kernel
+# given to furnsh so far, which names the on-disk cache
+_pending = []
+_digest = None
+_disk = None
+_dirty = False
 
 
 def furnsh(kernel: str | tuple | list):
-    if not isinstance(kernel, list):
+    if isinstance(kernel, str):
         kernel = (kernel,)
 
-        for k in kernel:
-            sp.furnsh(k)
+    global _leapseconds, _digest, _disk
+
+    flush_cache()
+    digest = hashlib.sha256(b"" if _digest is None else _digest.encode())
+    for k in kernel:
+        kernel_digest = hashlib.sha256()
+        with open(k, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                kernel_digest.update(chunk)
+        digest.update(kernel_digest.digest())
+        _pending.append(k)
+    _digest = digest.hexdigest()
+    _disk = None
+
+    # Newly loaded kernels may change any cached state
+    _leapseconds = None
+    clear_cache()
+
+
+def load_kernels():
+    # Runs on the first query the on-disk cache can't answer, and is
+    # needed before calling spiceypy directly
+    global sp, SpiceyError
+
+    if sp is None:
+        import spiceypy as sp
+        from spiceypy.utils.exceptions import SpiceyError
+
+    while _pending:
+        sp.furnsh(_pending.pop(0))
+
+
+def set_cache_directory(directory: str):
+    global CACHE_DIRECTORY, _disk
+
+    flush_cache()
+    CACHE_DIRECTORY = directory
+    _disk = None
+
+
+def _cache_path():
+    if CACHE_DIRECTORY is None or _digest is None:
+        return None
+
+    return os.path.join(CACHE_DIRECTORY, _digest + ".npz")
+
+
+def _cached(key: str, query):
+    global _disk, _dirty
+
+    if _disk is None:
+        _disk = {}
+        path = _cache_path()
+        if path is not None and os.path.exists(path):
+            with np.load(path) as data:
+                _disk = {name: data[name] for name in data.files}
+
+    if key not in _disk:
+        load_kernels()
+        _disk[key] = np.asarray(query(), dtype=float)
+        _dirty = True
+
+    return _disk[key]
+
+
+def flush_cache():
+    global _dirty
+
+    path = _cache_path()
+    if not _dirty or path is None:
+        return
+
+    # Other processes may share the cache, so each writes its own file
+    # and readers only ever see a complete one
+    os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        np.savez(file, **_disk)
+    os.replace(temporary, path)
+    _dirty = False
+
+
+atexit.register(flush_cache)
 
 
 def set_observer(observer: int):
@@ -28,25 +132,89 @@ def set_reference(reference: str):
 
 
 def dt2utc(time: datetime.datetime):
-    return time.strftime("%Y-%m-%dT00:00:00")
+    return time.strftime("%Y-%m-%dT%H:%M:%S.%f")
 
 
-def dt2et(time: datetime.datetime):
-    return sp.utc2et(dt2utc(time))
+def _pool(name: str, count: int):
+    return _cached(f"pool/{name}", lambda: sp.gdpool(name, 0, count))
 
 
-def position(
+def deltet():
+    # Pool constants of the time conversion, saved with tables that
+    # convert epochs without kernels
+    return {name: _pool(f"DELTET/{name.upper()}", count)
+            for name, count in DELTET.items()}
+
+
+def _table(delta_at, delta_t_a, k, eb, m):
+    # Epochs before the first entry use one second less, as in utc2et
+    table = np.reshape(delta_at, (-1, 2))
+
+    return (
+        table[:, 1].tolist(),
+        np.concatenate(([table[0, 0] - 1], table[:, 0])),
+        float(delta_t_a[0]),
+        float(k[0]),
+        float(eb[0]),
+        np.asarray(m)
+    )
+
+
+def leapseconds(constants: dict = None):
+    global _leapseconds
+
+    if constants is not None:
+        return _table(**constants)
+
+    if _leapseconds is None:
+        _leapseconds = _table(**deltet())
+
+    return _leapseconds
+
+
+def _utc2et(time: np.array, table: tuple = None):
+    epochs, delta_at, delta_t_a, k, eb, m = table or leapseconds()
+
+    # Calendar seconds past J2000 with microsecond resolution
+    us = (time - J2000).astype(np.int64)
+    seconds = (us // 1000000).astype(float) + (us % 1000000) / 1e6
+
+    # UTC -> TAI -> TT -> TDB as in the SPICE leapseconds model
+    i = np.searchsorted(np.array(epochs), seconds, side="right")
+    tt = seconds + delta_at[i] + delta_t_a
+    anomaly = m[0] + m[1] * tt
+
+    return tt + k * np.sin(anomaly + eb * np.sin(anomaly))
+
+
+def dt2et(time: datetime.datetime | float | list, table: tuple = None):
+    if isinstance(time, datetime.datetime):
+        # Scalar path without array overhead, same model as _utc2et
+        epochs, delta_at, delta_t_a, k, eb, m = table or leapseconds()
+        delta = time - J2000.astype(datetime.datetime)
+        seconds = delta.days * 86400.0 + delta.seconds \
+            + delta.microseconds / 1e6
+        i = bisect.bisect_right(epochs, seconds)
+        tt = seconds + delta_at[i] + delta_t_a
+        anomaly = m[0] + m[1] * tt
+
+        return float(tt + k * math.sin(anomaly + eb * math.sin(anomaly)))
+
+    # Plain numbers are already ephemeris seconds
+    time = np.asarray(time)
+    if time.dtype.kind in "iuf":
+        return float(time) if time.ndim == 0 else time.astype(float)
+
+    return _utc2et(time.astype("datetime64[us]"), table)
+
+
+def _query(
         id: int,
-        time: datetime.datetime,
-        reference: str = None,
-        observer: int = None
+        et: float,
+        reference: str,
+        observer: int
 ):
-    if reference is None:
-        reference = REFERENCE
-    if observer is None:
-        observer = OBSERVER
-
-    et = dt2et(time)
+    load_kernels()
     state, _ = sp.spkgeo(
         targ=id,
         et=et,
@@ -54,10 +222,44 @@ def position(
         obs=observer
     )
 
-    return np.array((*state[:3],))*1000
+    state = np.array(state)*1000
+    state.flags.writeable = False
 
+    return state
 
-def velocity(
+
+_state = functools.lru_cache(maxsize=CACHE_SIZE)(_query)
+
+
+def _initial(
+        id: int,
+        et: float,
+        reference: str,
+        observer: int
+):
+    # Initial states are also kept on disk, other queries only in memory
+    return _cached(
+        f"state/{id}/{et!r}/{reference}/{observer}",
+        lambda: _state(id, et, reference, observer)
+    )
+
+
+def set_cache_size(size: int):
+    global CACHE_SIZE, _state
+
+    CACHE_SIZE = size
+    _state = functools.lru_cache(maxsize=CACHE_SIZE)(_query)
+
+
+def cache_info():
+    return _state.cache_info()
+
+
+def clear_cache():
+    _state.cache_clear()
+
+
+def state(
         id: int,
         time: datetime.datetime,
         reference: str = None,
@@ -68,38 +270,125 @@ def velocity(
     if observer is None:
         observer = OBSERVER
 
-    et = dt2et(time)
-    state, _ = sp.spkgeo(
-        targ=id,
-        et=et,
-        ref=reference,
-        obs=observer
-    )
+    return _state(id, dt2et(time), reference, observer)
 
-    return np.array((*state[3:6],))*1000
 
+def states(
+        ids: list,
+        times: list,
+        reference: str = None,
+        observer: int = None
+):
+    if reference is None:
+        reference = REFERENCE
+    if observer is None:
+        observer = OBSERVER
 
-def mass(id: int):
+    # Epochs are converted in one pass and shared by every body
+    load_kernels()
+    ets = np.atleast_1d(dt2et(times))
+    result = np.empty((len(ids), len(ets), 6))
+    for i, id in enumerate(ids):
+        for j, et in enumerate(ets):
+            result[i, j, :], _ = sp.spkgeo(
+                targ=int(id),
+                et=et,
+                ref=reference,
+                obs=observer
+            )
+
+    return result*1000
+
+
+def position(
+        id: int,
+        time: datetime.datetime,
+        reference: str = None,
+        observer: int = None
+):
+    return state(id, time, reference, observer)[:3].copy()
+
+
+def velocity(
+        id: int,
+        time: datetime.datetime,
+        reference: str = None,
+        observer: int = None
+):
+    return state(id, time, reference, observer)[3:6].copy()
+
+
+def _body(id: int):
+    # Constants of the planetary systems are kept with the planet itself
     if id < 10:
-        id = id*100+99
+        return id*100+99
+
+    return id
 
-    _, gm = sp.bodvcd(
-        bodyid=id,
-        item="GM",
-        maxn=1
+
+def _gm(id: int):
+    # Empty when the kernels have no GM for the body
+    body = _body(id)
+
+    return _cached(
+        f"gm/{body}",
+        lambda: sp.bodvcd(
+            bodyid=body,
+            item="GM",
+            maxn=1
+        )[1] if sp.bodfnd(body, "GM") else ()
     )
 
+
+def mass(id: int):
+    gm = _gm(id)
+    if len(gm) == 0:
+        raise ValueError(f"No GM for body {id} in the loaded kernels")
+
     return gm[0]*1000**3/GAMMA
 
 
-def radius(id: int):
-    if id < 10:
-        id = id*100+99
+def bodies(
+        ids: list,
+        time: datetime.datetime,
+        reference: str = None,
+        observer: int = None
+):
+    if reference is None:
+        reference = REFERENCE
+    if observer is None:
+        observer = OBSERVER
+
+    # Masses and states at one epoch, bodies without either are reported
+    # instead of raising
+    et = dt2et(time)
+    gm = np.zeros(len(ids))
+    result = np.zeros((len(ids), 6))
+    missing = []
+    for i, id in enumerate(ids):
+        value = _gm(id)
+        if len(value) == 0:
+            missing.append(id)
+            continue
+        try:
+            result[i, :] = _initial(int(id), et, reference, observer)
+        except SpiceyError:
+            missing.append(id)
+            continue
+        gm[i] = value[0]
+
+    return gm*1000**3/GAMMA, result, missing
+
 
-    _, rad = sp.bodvcd(
-        bodyid=id,
-        item="RADII",
-        maxn=3
+def radius(id: int):
+    body = _body(id)
+    rad = _cached(
+        f"radii/{body}",
+        lambda: sp.bodvcd(
+            bodyid=body,
+            item="RADII",
+            maxn=3
+        )[1]
     )
 
     return rad[0]*1000
@@ -110,15 +399,73 @@ class NBodySpice:
             self,
             start: datetime.datetime,
             reference: str = None,
-            observer: int = None
+            observer: int = None,
+            ephemeris=None
     ):
+        # Tables hold states in the frame and observer they were fitted for
+        if ephemeris is not None and (
+                (REFERENCE if reference is None else reference)
+                != ephemeris.reference
+                or (OBSERVER if observer is None else observer)
+                != ephemeris.observer
+        ):
+            raise ValueError(
+                "Ephemeris was fitted for another reference or observer"
+            )
+
+        self._start = start
         self._time = start
         self._reference = reference
         self._observer = observer
+        self._ephemeris = ephemeris
         self._ids = []
+        self._recorders = []
+        self._steps = 0
 
     def step(self, time: int):
         self._time += datetime.timedelta(seconds=time)
+        self._steps += 1
+
+        if self._recorders:
+            self._record()
+
+    def _state(self):
+        # Precomputed tables replace live queries when given
+        if self._ephemeris is not None:
+            return self._ephemeris.states(
+                self._ids,
+                self._ephemeris.et(self._time)
+            )[:, 0, :]
+
+        return states(
+            self._ids,
+            (self._time,),
+            reference=self._reference,
+            observer=self._observer
+        )[:, 0, :]
+
+    def _record(self):
+        # States are only looked up for frames a recorder keeps
+        elapsed = (self._time - self._start).total_seconds()
+        recorders = [
+            recorder for recorder in self._recorders
+            if recorder.wants(elapsed, self._steps)
+        ]
+        if not recorders:
+            return
+
+        state = self._state()
+        for recorder in recorders:
+            recorder.record(elapsed, state[:, :3], state[:, 3:], self._steps)
+
+    def attach(self, recorder):
+        recorder.open(self._start, self._ids)
+        self._recorders.append(recorder)
+        self._record()
+
+    def detach(self, recorder):
+        self._recorders.remove(recorder)
+        recorder.close()
 
     def add(
             self,
@@ -126,23 +473,13 @@ class NBodySpice:
     ):
         self._ids.append(id)
 
+    def add_catalogue(self, catalogue):
+        self._ids.extend(catalogue.ids[catalogue.display].tolist())
+
     @property
     def time(self):
         return self._time
 
     @property
     def position(self):
-        positions = np.empty((0, 3))
-        for id in self._ids:
-            positions = np.append(
-                positions,
-                position(
-                    id,
-                    self._time,
-                    reference=self._reference,
-                    observer=self._observer
-                )[None, :],
-                axis=0
-            )
-
-        return positions
+        return self._state()[:, :3]